@@ -0,0 +1,121 @@
+"""
+Benchmark de la ingesta del puerto de clock: modo 'poll' frente a 'callback'.
+
+Emula un puerto de entrada de mido con backend rtmidi (cola para poll()/receive() y
+propiedad 'callback') y mide, para cada modo de config["clock"]["ingestion"]:
+  - CPU del proceso con el puerto en silencio,
+  - CPU con 120 BPM de clock entrante (incluye el hilo que emite los ticks),
+  - latencia desde la entrega del tick por el "driver" hasta process_clock_message.
+Cada modo se mide en un proceso aparte, porque los hilos de ingesta no se detienen.
+Usa el módulo 'resource', así que solo funciona en sistemas tipo Unix.
+
+Uso: python bench_ingestion.py [--seconds 5] [--bpm 120]
+"""
+import argparse
+import queue
+import resource
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+import mido
+
+import miditema
+
+
+class EmulatedRtmidiInput:
+    """Puerto de entrada con la misma semántica que mido.backends.rtmidi.Input."""
+    def __init__(self):
+        self._queue = queue.SimpleQueue()
+        self._callback = None
+        self.closed = False
+
+    @property
+    def callback(self):
+        return self._callback
+
+    @callback.setter
+    def callback(self, function):
+        self._callback = function
+
+    def poll(self):
+        try:
+            return self._queue.get_nowait()
+        except queue.Empty:
+            return None
+
+    def receive(self):
+        return self._queue.get()
+
+    def deliver(self, msg):
+        """Lo que hace el driver al llegar un mensaje: callback si lo hay, si no a la cola."""
+        (self._callback or self._queue.put)(msg)
+
+
+def cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def run_mode(mode: str, seconds: float, bpm: float):
+    port = EmulatedRtmidiInput()
+    miditema.midi_inputs["clock"] = port
+    miditema.config = {"clock": {"ingestion": mode}}
+    delivered_at = {}
+    latencies = []
+
+    def timed_process_clock_message(msg, timestamp=None):
+        latencies.append(time.perf_counter() - delivered_at.pop(id(msg)))
+
+    miditema.process_clock_message = timed_process_clock_message
+    if mode == "poll":
+        threading.Thread(target=miditema.midi_input_listener, daemon=True).start()
+    else:
+        miditema.start_event_ingestion()
+    time.sleep(0.2)
+
+    start = cpu_seconds()
+    time.sleep(seconds)
+    idle_cpu = (cpu_seconds() - start) / seconds * 100
+
+    interval = 60.0 / (bpm * miditema.MIDI_PPQN)
+    start = cpu_seconds()
+    end = time.perf_counter() + seconds
+    next_tick = time.perf_counter()
+    while time.perf_counter() < end:
+        next_tick += interval
+        while time.perf_counter() < next_tick:
+            time.sleep(0.0002)
+        msg = mido.Message('clock')
+        delivered_at[id(msg)] = time.perf_counter()
+        port.deliver(msg)
+    time.sleep(0.05)
+    playing_cpu = (cpu_seconds() - start) / seconds * 100
+
+    latencies_us = sorted(latency * 1e6 for latency in latencies)
+    p99 = latencies_us[int(len(latencies_us) * 0.99) - 1]
+    print(f"{mode:8}  CPU parado {idle_cpu:5.1f} %   CPU con clock {playing_cpu:5.1f} %   "
+          f"latencia µs: mediana {statistics.median(latencies_us):7.1f}  p99 {p99:7.1f}  "
+          f"máx {latencies_us[-1]:7.1f}  ({len(latencies_us)} ticks)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la ingesta del puerto de clock.")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--bpm", type=float, default=120.0)
+    parser.add_argument("--mode", choices=("poll", "callback"), default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.seconds, args.bpm)
+        return
+    print(f"{args.seconds:.0f} s en silencio y {args.seconds:.0f} s a {args.bpm:.0f} BPM por modo\n")
+    for mode in ("poll", "callback"):
+        subprocess.run([sys.executable, __file__, "--mode", mode,
+                        "--seconds", str(args.seconds), "--bpm", str(args.bpm)], check=True)
+
+
+if __name__ == "__main__":
+    main()
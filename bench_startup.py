@@ -0,0 +1,111 @@
+"""
+Benchmark del arranque de MIDItema con un directorio de canciones como playlist.
+
+Genera un directorio temporal con N canciones JSON5 y mide el mismo recorrido que
+'python miditema.py <directorio>/': índice global de partes (lee todas las
+canciones) y carga de la primera canción. Compara tres casos:
+  - sin caché en disco (json5 + jsonschema en cada archivo),
+  - caché fría (primer arranque: además escribe las entradas),
+  - caché caliente (arranques siguientes con el set sin cambios).
+Cada repetición vacía la caché en memoria para simular un proceso nuevo.
+
+Uso: python bench_startup.py [--songs 100] [--parts 16] [--repeat 5]
+"""
+import argparse
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import miditema
+
+
+def write_song_set(directory: Path, song_count: int, part_count: int):
+    for song_idx in range(song_count):
+        parts = []
+        for part_idx in range(part_count):
+            # Un cue (1-127) en la primera parte de cada canción
+            cue = f"cue: {song_idx + 1}, " if part_idx == 0 and song_idx < 127 else ""
+            parts.append(
+                f'        {{ name: "Parte {part_idx + 1}", bars: {4 + part_idx % 4 * 4}, '
+                f'repeat_pattern: [true, false], {cue}\n'
+                f'          output: [{{ device: "MIDItema", channel: 0, program: "part_index" }}] }},  // parte {part_idx + 1}'
+            )
+        song = (
+            "// Canción generada por bench_startup.py\n"
+            "{\n"
+            f'    song_name: "Bench {song_idx:03d}",\n'
+            '    color: "blue",\n'
+            '    time_signature: "4/4",\n'
+            '    time_division: "1/4",\n'
+            "    triggers: {\n"
+            '        part_change: [{ device: "MIDItema", control: 20, value: "part_index" }],\n'
+            '        bar_triggers: [{ device: "MIDItema", each_bar: 4, note: 36, velocity: "block_number" }],\n'
+            "    },\n"
+            "    parts: [\n" + "\n".join(parts) + "\n    ],\n"
+            "}\n"
+        )
+        (directory / f"bench_{song_idx:03d}.json5").write_text(song, encoding="utf-8")
+
+
+def simulated_startup(directory: Path):
+    """Carga 'directory' como playlist, igual que main() en modo directorio."""
+    miditema.song_data_cache.purge()
+    miditema.song_prefetcher.clear()
+    miditema._transition_graphs.clear()
+    miditema.SONGS_DIR = directory
+    json_files = sorted(list(directory.glob("*.json")) + list(directory.glob("*.json5")))
+    miditema.playlist_state = miditema.PlaylistState()
+    miditema.playlist_state.is_active = True
+    miditema.playlist_state.playlist_elements = [{"filepath": f.name} for f in json_files]
+    miditema.global_parts_manager.build_global_parts_list()
+    if not miditema.load_song_from_playlist(0):
+        raise RuntimeError("No se pudo cargar la primera canción")
+
+
+def measure(directory: Path, repeat: int, before_each=None):
+    times = []
+    for _ in range(repeat):
+        if before_each:
+            before_each()
+        start = time.perf_counter()
+        simulated_startup(directory)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del arranque con un directorio de canciones.")
+    parser.add_argument("--songs", type=int, default=100)
+    parser.add_argument("--parts", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="miditema_bench_"))
+    songs_dir = work_dir / "temas"
+    songs_dir.mkdir()
+    cache = miditema.persistent_song_cache
+    cache.directory = work_dir / "cache"
+    try:
+        write_song_set(songs_dir, args.songs, args.parts)
+        print(f"{args.songs} canciones x {args.parts} partes, {args.repeat} repeticiones\n")
+
+        cache.enabled = False
+        results = {"sin caché": measure(songs_dir, args.repeat)}
+
+        cache.enabled = True
+        results["caché fría"] = measure(songs_dir, args.repeat,
+                                        before_each=lambda: shutil.rmtree(cache.directory, ignore_errors=True))
+        cache.hits = cache.misses = 0
+        results["caché caliente"] = measure(songs_dir, args.repeat)
+
+        for name, times in results.items():
+            print(f"{name:15} mediana {statistics.median(times):8.1f} ms   mín {min(times):8.1f} ms")
+        print(f"\nCaché caliente: {cache.hits} aciertos, {cache.misses} fallos")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark del tick de cambio de canción en un setlist, con y sin SongPrefetcher.
+
+Genera un directorio temporal de canciones (como bench_startup.py), lo carga como
+playlist en Song Mode y, para cada cambio de canción, coloca la canción en su último
+beat, deja pasar 'beat_time' (los beats que sonarían antes, durante los que el
+prefetcher prepara la siguiente canción) y mide process_song_tick en el beat que
+termina la canción: es el tiempo que el hilo del reloj pasa en la transición.
+Sin prefetcher, la siguiente canción se prepara en ese mismo tick.
+La caché en disco se desactiva; los datos parseados siguen en la caché en memoria
+(el índice global de partes ya leyó todas las canciones), así que la diferencia es
+construir y compilar el SongState de la canción en el hilo del reloj.
+
+Uso: python bench_transition.py [--songs 8] [--parts 32] [--beat-time 0.3]
+"""
+import argparse
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import miditema
+from bench_startup import simulated_startup, write_song_set
+
+
+def measure_transitions(songs_dir: Path, beat_time: float) -> list:
+    simulated_startup(songs_dir)
+    miditema.clock_state.status = "PLAYING"
+    miditema.repeat_override_active = True  # Song Mode: al terminar la última parte pasa a la siguiente canción
+    times = []
+    for song_index in range(len(miditema.playlist_state.playlist_elements) - 1):
+        miditema.setup_part(len(miditema.song_state.parts) - 1, fire_instant_trigger=False)
+        miditema.song_state.remaining_beats_in_part = 1
+        miditema.song_state.midi_clock_tick_counter = 0
+        miditema.song_prefetcher.watch()
+        time.sleep(beat_time)
+        start = time.perf_counter()
+        miditema.process_song_tick(start)
+        times.append((time.perf_counter() - start) * 1000)
+        if miditema.playlist_state.current_song_index != song_index + 1:
+            raise RuntimeError(f"La canción {song_index} no pasó a la siguiente")
+    miditema.clock_state.status = "STOPPED"
+    return times
+
+
+def report(name: str, times: list):
+    print(f"{name:15} mediana {statistics.median(times):7.2f} ms   máx {max(times):7.2f} ms   "
+          f"({len(times)} transiciones)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del tick de cambio de canción.")
+    parser.add_argument("--songs", type=int, default=8)
+    parser.add_argument("--parts", type=int, default=32)
+    parser.add_argument("--beat-time", type=float, default=0.3)
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="miditema_bench_"))
+    songs_dir = work_dir / "temas"
+    songs_dir.mkdir()
+    miditema.persistent_song_cache.enabled = False
+    prefetcher = miditema.song_prefetcher
+    try:
+        write_song_set(songs_dir, args.songs, args.parts)
+        print(f"{args.songs} canciones x {args.parts} partes\n")
+
+        request = prefetcher.request
+        prefetcher.request = lambda song_index: None
+        report("sin prefetcher", measure_transitions(songs_dir, args.beat_time))
+        prefetcher.request = request
+        prefetcher.hits = prefetcher.misses = 0
+        report("con prefetcher", measure_transitions(songs_dir, args.beat_time))
+        print(f"\nPrefetcher: {prefetcher.hits} aciertos, {prefetcher.misses} fallos")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
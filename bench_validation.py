@@ -0,0 +1,85 @@
+"""
+Micro-benchmark del coste de validar una canción con MIDItemaValidator.
+
+Compara, para las canciones de 'temas/' y una canción generada de N partes:
+  - validador nuevo por llamada (clase y validador creados en cada validación,
+    como hacía validate_data antes de reutilizarlos),
+  - validate_data con los validadores compilados una vez por proceso.
+
+Uso: python bench_validation.py [--parts 16] [--repeat 200]
+"""
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+from jsonschema import Draft7Validator
+
+import json_loader
+from schema_validator import MIDItemaValidator
+
+SONGS_DIR = Path(__file__).parent / "temas"
+
+
+def generated_song(part_count: int) -> dict:
+    return {
+        "song_name": "Bench",
+        "time_signature": "4/4",
+        "triggers": {"part_change": [{"device": "MIDItema", "control": 20, "value": "part_index"}]},
+        "parts": [
+            {"name": f"Parte {i + 1}", "bars": 8, "repeat_pattern": [True, False],
+             "output": [{"device": "MIDItema", "channel": 0, "program": "part_index"}]}
+            for i in range(part_count)
+        ],
+    }
+
+
+def validate_with_fresh_validator(data: dict):
+    """Validación con un validador recién creado (el camino anterior)."""
+    validator_class = MIDItemaValidator._extend_with_default(Draft7Validator)
+    validator = validator_class(MIDItemaValidator.SONG_SCHEMA)
+    errors = list(validator.iter_errors(data))
+    return errors + MIDItemaValidator._validate_song_custom(data)
+
+
+def time_per_call(function, songs: list, repeat: int) -> list:
+    times = []
+    for _ in range(repeat):
+        for data in songs:
+            start = time.perf_counter()
+            function(data)
+            times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def report(name: str, times: list):
+    times = sorted(times)
+    p99 = times[int(len(times) * 0.99) - 1]
+    print(f"  {name:28} mediana {statistics.median(times):7.3f} ms   p99 {p99:7.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark de la validación por canción.")
+    parser.add_argument("--parts", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    repo_songs = []
+    for path in sorted(SONGS_DIR.glob("*.json")):
+        data = json_loader.loads(path.read_text(encoding="utf-8"))
+        if "songs" not in data:
+            repo_songs.append(data)
+
+    cases = [(f"{len(repo_songs)} canciones de temas/", repo_songs),
+             (f"canción generada de {args.parts} partes", [generated_song(args.parts)])]
+    for label, songs in cases:
+        # Primera pasada fuera de la medida: aplica los valores por defecto y compila los validadores
+        for data in songs:
+            MIDItemaValidator.validate_data(data)
+        print(f"{label} (ms por canción):")
+        report("validador nuevo por llamada", time_per_call(validate_with_fresh_validator, songs, args.repeat))
+        report("validador reutilizado", time_per_call(MIDItemaValidator.validate_data, songs, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
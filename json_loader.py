@@ -0,0 +1,100 @@
+"""
+Carga de archivos JSON/JSON5 de MIDItema por el camino más barato que sirva.
+
+Casi todos los archivos de canción, playlist y configuración son JSON estricto o
+JSON con comentarios y comas finales; solo unos pocos usan sintaxis exclusiva de
+JSON5 (claves sin comillas, strings con comillas simples, hexadecimales...).
+El texto se intenta, en orden:
+  1. "strict":   parser estricto en C (orjson si está instalado, si no el json de la stdlib).
+  2. "stripped": el mismo parser tras quitar comentarios y comas finales.
+  3. "json5":    json5, completo pero en Python puro y mucho más lento.
+Los tres caminos devuelven los mismos datos para un mismo archivo JSON5 válido.
+"""
+import collections
+import json
+import re
+import threading
+
+import json5
+
+try:
+    import orjson  # Opcional: más rápido que el json de la stdlib
+except ImportError:
+    orjson = None
+
+PATH_STRICT = "strict"
+PATH_STRIPPED = "stripped"
+PATH_JSON5 = "json5"
+
+# Strings entre comillas dobles (se conservan tal cual), comentarios de línea y de bloque
+_COMMENT_RE = re.compile(r'("(?:[^"\\]|\\.)*")|//[^\n]*|/\*.*?\*/', re.DOTALL)
+# Coma seguida solo de espacio en blanco antes de '}' o ']'
+_TRAILING_COMMA_RE = re.compile(r'("(?:[^"\\]|\\.)*")|,(\s*[}\]])', re.DOTALL)
+_JSON5_LINE_RE = re.compile(r'^<string>:(\d+)')
+
+path_counts = collections.Counter()  # camino -> nº de textos cargados por él
+_counts_lock = threading.Lock()
+
+
+class JSONLoadError(ValueError):
+    """Error de sintaxis en un texto JSON/JSON5, con la línea del error si se conoce."""
+    def __init__(self, message: str, lineno: int = None):
+        super().__init__(message)
+        self.lineno = lineno
+
+
+def _strict_loads(text: str):
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def _strip_comment(match):
+    if match.group(1):
+        return match.group(1)
+    # Un comentario de bloque deja sus saltos de línea para no desplazar los números de línea
+    return "\n" * match.group(0).count("\n")
+
+
+def _strip_trailing_comma(match):
+    return match.group(1) or match.group(2)
+
+
+def strip_json5_extras(text: str) -> str:
+    """Quita comentarios y comas finales fuera de los strings; el resto del texto no cambia."""
+    if "/" in text:
+        text = _COMMENT_RE.sub(_strip_comment, text)
+    if "," in text:
+        text = _TRAILING_COMMA_RE.sub(_strip_trailing_comma, text)
+    return text
+
+
+def loads_with_path(text: str):
+    """
+    Parsea 'text' y devuelve (datos, camino), siendo camino PATH_STRICT,
+    PATH_STRIPPED o PATH_JSON5. Lanza JSONLoadError si el texto no es JSON5 válido.
+    """
+    try:
+        data, path = _strict_loads(text), PATH_STRICT
+    except ValueError:
+        try:
+            data, path = _strict_loads(strip_json5_extras(text)), PATH_STRIPPED
+        except ValueError:
+            try:
+                data, path = json5.loads(text), PATH_JSON5
+            except ValueError as e:
+                match = _JSON5_LINE_RE.match(str(e))
+                raise JSONLoadError(str(e), int(match.group(1)) if match else None) from None
+    with _counts_lock:
+        path_counts[path] += 1
+    return data, path
+
+
+def loads(text: str):
+    """Parsea un texto JSON/JSON5. Lanza JSONLoadError si no es válido."""
+    return loads_with_path(text)[0]
+
+
+def load(fp):
+    """Parsea un archivo JSON/JSON5 ya abierto en modo texto."""
+    return loads(fp.read())
@@ -9,8 +9,13 @@ import sys
 import threading
 import math
 import html
-import json5
+import json_loader
 import random
+import bisect
+import collections
+import heapq
+import hashlib
+import os
 from pythonosc import udp_client
 from pythonosc import osc_message_builder
 from schema_validator import MIDItemaValidator, ValidationError
@@ -48,6 +53,8 @@ import tui as tui
 # --- Global Configuration ---
 SONGS_DIR_NAME = "temas"
 SONGS_DIR = Path(f"./{SONGS_DIR_NAME}")
+CACHE_DIR_NAME = "miditema"  # Subcarpeta de la caché del usuario (ver user_cache_dir)
+CACHE_FORMAT_VERSION = 2  # Subir si cambia el contenido de las entradas o su normalización
 CONF_FILE_NAME = "miditema.conf.json"
 SHUTDOWN_FLAG = False
 MIDI_PPQN = 24  # MIDI Clock Standard, no configurable
@@ -200,18 +207,151 @@ CC0_VAL_SONG_RESTART = 20
 
 # --- State Classes ---
 
+class TickIntervalStats:
+    """
+    Ventana deslizante de los últimos intervalos entre ticks en un buffer circular.
+    Cada tick cuesta O(1): suma y suma de cuadrados acumuladas (se recalculan
+    exactas al dar la vuelta al buffer para no acumular error), y mínimo/máximo
+    con colas monótonas.
+    """
+    def __init__(self, size: int = 96, recent_size: int = MIDI_PPQN):
+        self.size = size
+        self.recent_size = recent_size  # Ventana corta (un beat) para detectar derivas
+        self.reset()
+
+    def reset(self):
+        self.intervals = [0.0] * self.size
+        self.index = 0
+        self.count = 0
+        self.sequence = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.recent_total = 0.0
+        self._min_queue = collections.deque()  # (secuencia, intervalo) crecientes
+        self._max_queue = collections.deque()  # (secuencia, intervalo) decrecientes
+
+    def add(self, interval: float):
+        size = self.size
+        index = self.index
+        old = self.intervals[index]
+        recent_index = index - self.recent_size
+        recent_old = self.intervals[recent_index] if self.count >= self.recent_size else 0.0
+
+        self.intervals[index] = interval
+        if self.count < size:
+            self.count += 1
+        else:
+            self.total -= old
+            self.total_sq -= old * old
+        self.total += interval
+        self.total_sq += interval * interval
+        self.recent_total += interval - recent_old
+
+        sequence = self.sequence
+        self.sequence += 1
+        expired = sequence - size
+        min_queue, max_queue = self._min_queue, self._max_queue
+        while min_queue and min_queue[-1][1] >= interval: min_queue.pop()
+        min_queue.append((sequence, interval))
+        while min_queue[0][0] <= expired: min_queue.popleft()
+        while max_queue and max_queue[-1][1] <= interval: max_queue.pop()
+        max_queue.append((sequence, interval))
+        while max_queue[0][0] <= expired: max_queue.popleft()
+
+        self.index = index + 1
+        if self.index == size:
+            self.index = 0
+            # Recalcular las sumas exactas una vez por vuelta (coste amortizado O(1))
+            self.total = math.fsum(self.intervals)
+            self.total_sq = math.fsum(x * x for x in self.intervals)
+            self.recent_total = math.fsum(self.intervals[-self.recent_size:])
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def recent_mean(self) -> float:
+        recent = min(self.count, self.recent_size)
+        return self.recent_total / recent if recent else 0.0
+
+    @property
+    def std_dev(self) -> float:
+        if self.count < 2:
+            return 0.0
+        mean = self.total / self.count
+        return math.sqrt(max(0.0, self.total_sq / self.count - mean * mean))
+
+    @property
+    def minimum(self) -> float:
+        return self._min_queue[0][1] if self._min_queue else 0.0
+
+    @property
+    def maximum(self) -> float:
+        return self._max_queue[0][1] if self._max_queue else 0.0
+
 class ClockState:
     """Almacena el estado del reloj MIDI entrante."""
+    # Criterio de tempo estable: al menos dos beats de muestras, jitter relativo bajo
+    # y el tempo del último beat pegado al de la ventana completa (con margen para el
+    # ruido que el propio jitter introduce en la media de un solo beat)
+    STABLE_MIN_TICKS = 2 * MIDI_PPQN
+    STABLE_MAX_RELATIVE_JITTER = 0.10
+    STABLE_MAX_RELATIVE_DRIFT = 0.005
+
     def __init__(self):
         self.status = "STOPPED"
         self.bpm = 0.0
         self.source_name = "Ninguna"
         self.source_id = None
-        self.tick_times = [] # Para promediar el BPM
-        self.last_tick_time = 0
+        self.tick_stats = TickIntervalStats() # Para promediar el BPM
+        self.jitter_ms = 0.0           # Desviación típica del intervalo entre ticks
+        self.tick_interval_min_ms = 0.0
+        self.tick_interval_max_ms = 0.0
+        self.tempo_stable = False
+        self.last_tick_time = 0        # Llegada del último tick (perf_counter, hora del driver si la hay)
+        self.last_beat_time = 0        # Llegada del tick que cerró el último beat de la canción
+        self.input_latency_ms = 0.0    # Llegada -> procesado del último tick
+        self.input_latency_max_ms = 0.0
+        # Contadores del flywheel: ticks reales, sintetizados en cortes, avanzados de golpe
+        # al reconciliar y ticks reales absorbidos por ir por delante
+        self.real_ticks = 0
+        self.synthesized_ticks = 0
+        self.caught_up_ticks = 0
+        self.swallowed_ticks = 0
         self.start_time = 0
         self.paused_set_elapsed_time = 0
 
+    def register_input_latency(self, latency: float):
+        self.input_latency_ms = latency * 1000
+        if self.input_latency_ms > self.input_latency_max_ms:
+            self.input_latency_max_ms = self.input_latency_ms
+
+    def register_tick_interval(self, delta: float):
+        """Añade un intervalo entre ticks y publica BPM, jitter y estabilidad del tempo."""
+        stats = self.tick_stats
+        stats.add(delta)
+        mean = stats.mean
+        self.bpm = (60.0 / MIDI_PPQN) / mean
+        jitter = stats.std_dev
+        self.jitter_ms = jitter * 1000
+        self.tick_interval_min_ms = stats.minimum * 1000
+        self.tick_interval_max_ms = stats.maximum * 1000
+        drift_margin = max(mean * self.STABLE_MAX_RELATIVE_DRIFT, 3 * jitter / math.sqrt(stats.recent_size))
+        self.tempo_stable = (stats.count >= self.STABLE_MIN_TICKS and
+                             jitter <= mean * self.STABLE_MAX_RELATIVE_JITTER and
+                             abs(stats.recent_mean - mean) <= drift_margin)
+
+    def reset_tempo(self):
+        self.tick_stats.reset()
+        self.last_tick_time = 0 # El primer intervalo tras la parada no debe incluir la pausa
+        self.bpm = 0.0
+        self.jitter_ms = 0.0
+        self.tick_interval_min_ms = 0.0
+        self.tick_interval_max_ms = 0.0
+        self.tempo_stable = False
+        self.input_latency_max_ms = 0.0
+
 class SongState:
     """Almacena el estado de la canción y la secuencia."""
     def __init__(self):
@@ -219,7 +359,11 @@ class SongState:
         self.song_name = "Elige canción/setlist en el menú"
         self.song_color = None
         self.triggers = {}
+        self.compiled_triggers = {}      # evento -> [CompiledAction]
+        self.compiled_part_outputs = []  # índice de parte -> [CompiledAction]
         self.parts = []
+        self.part_beat_offsets = [0]     # Beat de inicio de cada parte en el orden lineal (+ total al final)
+        self.bpm = None                  # Tempo de la canción ('bpm'), usado por el motor MTC
         self.current_part_index = -1
         self.remaining_beats_in_part = 0
         self.pass_count = 0
@@ -237,75 +381,198 @@ class PlaylistState:
         self.is_active = False
         self.playlist_name = "Sin Playlist"
         self.triggers = {}
+        self.compiled_triggers = {}  # evento -> [CompiledAction]
+        self.trigger_devices = {}    # evento -> último dispositivo (herencia hacia la canción)
         self.playlist_elements = [] # Puede contener rutas o datos de canción
         self.current_song_index = -1
         self.beats = 2
 
 class GlobalPartInfo:
-    """Información de una parte en el contexto global de la playlist."""
-    def __init__(self, song_index, part_index, part_data, song_name=None, song_color=None):
+    """Información de una parte en el contexto global de la playlist (campos resueltos al construirla)."""
+    __slots__ = ("song_index", "part_index", "part_data", "song_name", "song_color", "global_part_index",
+                 "name", "bars", "color", "notes", "cue", "output")
+
+    def __init__(self, song_index, part_index, part_data, song_name=None, song_color=None, global_part_index=None):
         self.song_index = song_index
         self.part_index = part_index
         self.part_data = part_data
         self.song_name = song_name or "Unknown"
         self.song_color = song_color
-        
-    @property
-    def global_part_index(self):
-        """Returns the global index of this part across all songs."""
-        return _get_global_part_index(self.song_index, self.part_index)
-        
-    @property
-    def name(self):
-        return self.part_data.get("name", "N/A")
-        
-    @property
-    def bars(self):
-        return self.part_data.get("bars", 0)
-        
-    @property
-    def color(self):
-        return self.part_data.get("color")
-        
-    @property
-    def notes(self):
-        return self.part_data.get("notes")
-        
-    @property
-    def cue(self):
-        return self.part_data.get("cue")
-        
-    @property
-    def output(self):
-        return self.part_data.get("output", [])
+        self.global_part_index = global_part_index if global_part_index is not None else part_index
+        self.name = part_data.get("name", "N/A")
+        self.bars = part_data.get("bars", 0)
+        self.color = part_data.get("color")
+        self.notes = part_data.get("notes")
+        self.cue = part_data.get("cue")
+        self.output = part_data.get("output", [])
 
 class GlobalPartsManager:
     """Manages a global list of all parts across all songs in the playlist."""
     def __init__(self):
         self.global_parts = []  # List of GlobalPartInfo objects
+        # Prefix sums: song_part_offsets[i] is the global index of the first part of song i.
+        # It has one extra trailing entry holding the total number of parts.
+        self.song_part_offsets = [0]
+        self.parts_by_position = {}  # (song_index, part_index) -> GlobalPartInfo
+        self.parts_by_cue = {}       # cue number -> GlobalPartInfo (first occurrence in the setlist)
+        self.duplicate_cues = {}     # cue number -> [(song_index, part_index), ...] when defined more than once
+        self.song_sources = []       # song_index -> parts list each song was indexed from (compared by identity)
+        self.prediction_version = 0
+        self._prediction_cache = None  # (key, pending_action, song_state, GlobalPartInfo)
         self.is_initialized = False
         
     def build_global_parts_list(self):
-        """Builds the global parts list from the current playlist."""
-        self.global_parts.clear()
+        """
+        Builds the global parts list, the per-song part offsets and the lookup tables from the current playlist.
+        This is a full rebuild that reads every element of the setlist: call it when a playlist (or a single
+        song) is loaded. Song changes within the playlist go through refresh_song instead.
+        """
+        global_parts = []
+        offsets = [0]
+        sources = []
         
         if not playlist_state.is_active:
             # Single song mode
-            for part_idx, part_data in enumerate(song_state.parts):
-                part_info = GlobalPartInfo(0, part_idx, part_data, song_state.song_name, song_state.song_color)
-                self.global_parts.append(part_info)
+            global_parts.extend(self._make_song_parts(0, song_state.parts, song_state.song_name, song_state.song_color, 0))
+            offsets.append(len(global_parts))
+            sources.append(song_state.parts)
         else:
             # Playlist mode
             for song_idx, song_element in enumerate(playlist_state.playlist_elements):
                 song_parts = _get_parts_from_playlist_element(song_element)
-                song_name = song_element.get("song_name", Path(song_element.get("filepath", "N/A")).stem)
-                song_color = song_element.get("color")
-                
-                for part_idx, part_data in enumerate(song_parts):
-                    part_info = GlobalPartInfo(song_idx, part_idx, part_data, song_name, song_color)
-                    self.global_parts.append(part_info)
-        
+                song_name, song_color = self._element_identity(song_element)
+                global_parts.extend(self._make_song_parts(song_idx, song_parts, song_name, song_color, len(global_parts)))
+                offsets.append(len(global_parts))
+                sources.append(song_parts)
+
+        parts_by_position = {(part_info.song_index, part_info.part_index): part_info for part_info in global_parts}
+        self._swap_in(global_parts, offsets, sources, parts_by_position, self._index_cues(global_parts))
+
+    def refresh_song(self, song_index, song_parts=None):
+        """
+        Brings the entries of one playlist song up to date, e.g. after its file was edited on disk and
+        reloaded. If the song is still indexed from the same parts list (plain navigation) nothing is
+        touched; otherwise only that song's entries are replaced and the following offsets shifted.
+        'song_parts' is the parts list just loaded for the song; if omitted it is read from the element.
+        """
+        if not playlist_state.is_active or not self.is_initialized or not (0 <= song_index < len(self.song_sources)):
+            self.build_global_parts_list()
+            return
+        song_element = playlist_state.playlist_elements[song_index]
+        if song_parts is None:
+            song_parts = _get_parts_from_playlist_element(song_element)
+        if song_parts is self.song_sources[song_index]:
+            return
+
+        offsets = self.song_part_offsets
+        start, end = offsets[song_index], offsets[song_index + 1]
+        song_name, song_color = self._element_identity(song_element)
+        new_parts = self._make_song_parts(song_index, song_parts, song_name, song_color, start)
+        old_parts = self.global_parts[start:end]
+        delta = len(new_parts) - len(old_parts)
+
+        global_parts = self.global_parts[:start] + new_parts + self.global_parts[end:]
+        new_offsets = offsets[:song_index + 1] + [offset + delta for offset in offsets[song_index + 1:]]
+        if delta:
+            for part_info in global_parts[start + len(new_parts):]:
+                part_info.global_part_index += delta
+        sources = list(self.song_sources)
+        sources[song_index] = song_parts
+
+        parts_by_position = dict(self.parts_by_position)
+        for part_info in old_parts:
+            del parts_by_position[(song_index, part_info.part_index)]
+        for part_info in new_parts:
+            parts_by_position[(song_index, part_info.part_index)] = part_info
+
+        # The cue tables only need reindexing if the song defined or defines cues
+        if any(part_info.cue is not None for part_info in old_parts + new_parts):
+            cue_tables = self._index_cues(global_parts)
+        else:
+            cue_tables = (self.parts_by_cue, self.duplicate_cues)
+        self._swap_in(global_parts, new_offsets, sources, parts_by_position, cue_tables)
+
+    @staticmethod
+    def _element_identity(song_element):
+        """Returns the (song_name, song_color) shown for a playlist element."""
+        return song_element.get("song_name", Path(song_element.get("filepath", "N/A")).stem), song_element.get("color")
+
+    @staticmethod
+    def _make_song_parts(song_idx, song_parts, song_name, song_color, first_global_index):
+        return [GlobalPartInfo(song_idx, part_idx, part_data, song_name, song_color, first_global_index + part_idx)
+                for part_idx, part_data in enumerate(song_parts)]
+
+    @staticmethod
+    def _index_cues(global_parts):
+        """Returns (parts_by_cue, duplicate_cues) for a global parts list."""
+        parts_by_cue = {}
+        cue_locations = {}
+        for part_info in global_parts:
+            if part_info.cue is not None:
+                parts_by_cue.setdefault(part_info.cue, part_info)
+                cue_locations.setdefault(part_info.cue, []).append((part_info.song_index, part_info.part_index))
+        duplicate_cues = {cue: locations for cue, locations in cue_locations.items() if len(locations) > 1}
+        return parts_by_cue, duplicate_cues
+
+    def _swap_in(self, global_parts, offsets, sources, parts_by_position, cue_tables):
+        # Swap in the new structures at once so readers on other threads never see a half-built index
+        parts_by_cue, duplicate_cues = cue_tables
+        self.global_parts = global_parts
+        self.song_part_offsets = offsets
+        self.song_sources = sources
+        self.parts_by_position = parts_by_position
+        self.parts_by_cue = parts_by_cue
+        previous_duplicates = self.duplicate_cues
+        self.duplicate_cues = duplicate_cues
         self.is_initialized = True
+        self.invalidate_prediction()
+
+        if duplicate_cues and duplicate_cues != previous_duplicates:
+            self._report_duplicate_cues()
+
+    def _report_duplicate_cues(self):
+        """Reports cues defined in more than one part; jumps to them resolve to the first occurrence."""
+        details = []
+        for cue, locations in sorted(self.duplicate_cues.items()):
+            places = ", ".join(f"canción {song_idx + 1} parte {part_idx + 1}" for song_idx, part_idx in locations)
+            details.append(f"Cue {cue}: {places}")
+        _debug_log("Cues duplicados en el setlist (se usará la primera aparición): " + "; ".join(details))
+        set_feedback_message(f"[!] Cues duplicados en el setlist: {', '.join(str(cue) for cue in sorted(self.duplicate_cues))}")
+
+    def lookup_cue(self, cue_num):
+        """Returns (song_index, part_index, part_name) for a cue, or (None, None, None) if it is not defined."""
+        if not self.is_initialized:
+            self.build_global_parts_list()
+        part_info = self.parts_by_cue.get(cue_num)
+        if part_info is None:
+            return None, None, None
+        return part_info.song_index, part_info.part_index, part_info.name
+
+    def get_part_info(self, song_index, part_index):
+        """Returns the GlobalPartInfo at (song_index, part_index), or None."""
+        if not self.is_initialized:
+            self.build_global_parts_list()
+        return self.parts_by_position.get((song_index, part_index))
+
+    def global_index_of(self, song_index, part_index):
+        """Returns the global part index for (song_index, part_index), or None if the song is out of range."""
+        if not self.is_initialized:
+            self.build_global_parts_list()
+        offsets = self.song_part_offsets
+        if not (0 <= song_index < len(offsets) - 1):
+            return None
+        return offsets[song_index] + part_index
+
+    def locate_global_index(self, global_index):
+        """Returns (song_index, part_index) for a global part index, or (None, None) if out of range."""
+        if not self.is_initialized:
+            self.build_global_parts_list()
+        offsets = self.song_part_offsets
+        if not (0 <= global_index < offsets[-1]):
+            return None, None
+        # bisect_right skips songs without parts (repeated offsets)
+        song_index = bisect.bisect_right(offsets, global_index) - 1
+        return song_index, global_index - offsets[song_index]
         
     def get_current_global_part_info(self):
         """Gets the GlobalPartInfo for the current part."""
@@ -313,18 +580,37 @@ class GlobalPartsManager:
             self.build_global_parts_list()
             
         current_song_idx = playlist_state.current_song_index if playlist_state.is_active else 0
-        current_part_idx = song_state.current_part_index
-        
-        for part_info in self.global_parts:
-            if part_info.song_index == current_song_idx and part_info.part_index == current_part_idx:
-                return part_info
-        return None
+        return self.parts_by_position.get((current_song_idx, song_state.current_part_index))
         
+    def invalidate_prediction(self):
+        """
+        Bumps the prediction version so the next call to get_next_part_info recomputes.
+        Call it after changing, in place, any state the prediction depends on.
+        """
+        self.prediction_version += 1
+
     def get_next_part_info(self):
-        """Dynamically calculates and returns the next part that will be played."""
+        """
+        Returns the next part that will be played. The result is memoized and shared by the
+        engine and the UI until the prediction version or the state it depends on changes.
+        """
         if not self.is_initialized:
             self.build_global_parts_list()
-            
+
+        key = (self.prediction_version, playlist_state.current_song_index, song_state.current_part_index,
+               song_state.pass_count, part_loop_active, part_loop_index, repeat_override_active)
+        cached = self._prediction_cache
+        # pending_action and song_state are compared by identity: the cache holds a reference to them,
+        # so a new object can never be mistaken for the one the prediction was computed from.
+        if cached is not None and cached[0] == key and cached[1] is pending_action and cached[2] is song_state:
+            return cached[3]
+
+        next_part_info = self._predict_next_part_info()
+        self._prediction_cache = (key, pending_action, song_state, next_part_info)
+        return next_part_info
+
+    def _predict_next_part_info(self):
+        """Dynamically calculates the next part that will be played."""
         # Use the existing prediction logic to determine the next part
         action_to_predict = None
         
@@ -349,18 +635,171 @@ class GlobalPartsManager:
         if action_to_predict:
             dest_song_idx, dest_part_idx = predict_jump_destination(action_to_predict)
             if dest_song_idx is not None and dest_part_idx is not None:
-                for part_info in self.global_parts:
-                    if part_info.song_index == dest_song_idx and part_info.part_index == dest_part_idx:
-                        return part_info
+                return self.parts_by_position.get((dest_song_idx, dest_part_idx))
         
         return None
 
+def user_cache_dir() -> Path:
+    """
+    Carpeta de caché del usuario: %LOCALAPPDATA%\\miditema en Windows,
+    $XDG_CACHE_HOME/miditema (por defecto ~/.cache/miditema) en el resto.
+    """
+    if os.name == "nt" and os.environ.get("LOCALAPPDATA"):
+        base = Path(os.environ["LOCALAPPDATA"])
+    else:
+        base = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    return base / CACHE_DIR_NAME
+
+class PersistentSongCache:
+    """
+    Caché en disco (user_cache_dir) de archivos de canción y playlist ya parseados y
+    validados, para que un set sin cambios arranque sin parsear ni validar.
+    Cada entrada es un JSON con los datos normalizados (valores por defecto del schema
+    aplicados), nombrado por el sha256 del contenido del
+    archivo junto con la huella de los schemas y CACHE_FORMAT_VERSION: cualquier cambio
+    en el archivo o en el schema da otra clave. Solo se guardan archivos válidos; una
+    entrada que no se pueda leer o decodificar cuenta como fallo y se regenera. Si no
+    se puede escribir (carpeta de solo lectura, disco lleno), la caché se desactiva.
+    """
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self._salt = None
+
+    def _entry_path(self, content: bytes) -> Path:
+        if self._salt is None:
+            self._salt = f"{CACHE_FORMAT_VERSION}:{MIDItemaValidator.schema_fingerprint()}:".encode()
+        return self.directory / f"{hashlib.sha256(self._salt + content).hexdigest()}.json"
+
+    def load(self, path: Path):
+        """
+        Devuelve (datos, errores) de 'path'. Sin entrada en caché, parsea y valida el
+        archivo; con errores de lectura o de sintaxis, datos es None.
+        """
+        try:
+            content = path.read_bytes()
+        except OSError as e:
+            return None, [ValidationError(f"Error al leer archivo: {e}", [])]
+
+        entry_path = self._entry_path(content) if self.enabled else None
+        if entry_path is not None:
+            try:
+                entry = json.loads(entry_path.read_bytes())
+                if not (isinstance(entry, dict) and entry.get("format") == CACHE_FORMAT_VERSION
+                        and isinstance(entry.get("data"), dict)):
+                    raise ValueError("formato de entrada desconocido")
+                self.hits += 1
+                return entry["data"], []
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                _debug_log(f"Entrada de caché ilegible '{entry_path.name}': {e}")
+
+        self.misses += 1
+        try:
+            text = content.decode('utf-8')
+        except UnicodeDecodeError as e:
+            return None, [ValidationError(f"Error al leer archivo: {e}", [])]
+        data, errors = MIDItemaValidator.validate_content(text)
+        _debug_log(f"'{path.name}' parseado sin caché (vías del parser: {dict(json_loader.path_counts)})")
+        if entry_path is not None and data is not None and not errors:
+            self._store(entry_path, data)
+        return data, errors
+
+    def _store(self, entry_path: Path, data: dict):
+        try:
+            content = json.dumps({"format": CACHE_FORMAT_VERSION, "data": data},
+                                 ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        except (TypeError, ValueError) as e:
+            _debug_log(f"Entrada de caché no serializable: {e}")
+            return
+        # Escritura atómica: otro hilo o proceso nunca lee una entrada a medias
+        tmp_path = entry_path.with_name(f"{entry_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+            tmp_path.write_bytes(content)
+            os.replace(tmp_path, entry_path)
+        except OSError as e:
+            self.enabled = False
+            _debug_log(f"Caché en disco desactivada ({self.directory}): {e}")
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+
+
+class SongDataCache:
+    """
+    Caché en memoria de archivos de canción ya parseados y validados, indexada por
+    ruta resuelta, por delante de la caché en disco (PersistentSongCache). Cada
+    entrada se invalida si cambian el mtime o el tamaño del archivo en disco.
+    """
+    def __init__(self):
+        self._entries = {}  # ruta resuelta -> (mtime_ns, tamaño, datos, errores)
+        self._lock = threading.Lock()
+
+    def load(self, song_path: Path):
+        """
+        Devuelve los datos parseados de 'song_path', leyendo el disco solo si el
+        archivo no está en caché o ha cambiado. Lanza ValueError si no se puede
+        leer o parsear; los errores de validación no impiden devolver los datos.
+        """
+        data, errors = self.load_validated(song_path)
+        if data is None:
+            raise ValueError(errors[0].message if errors else f"No se pudo leer '{song_path}'")
+        return data
+
+    def load_validated(self, song_path: Path):
+        """
+        Devuelve (datos, errores de validación) de 'song_path'. Los datos ya llevan
+        aplicados los valores por defecto del schema; con errores de lectura o
+        sintaxis son None.
+        """
+        key = song_path.resolve()
+        try:
+            stat = key.stat()
+        except OSError as e:
+            return None, [ValidationError(f"Error al leer archivo: {e}", [])]
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            return entry[2], entry[3]
+
+        data, errors = persistent_song_cache.load(key)
+        if data is not None:
+            with self._lock:
+                self._entries[key] = (stat.st_mtime_ns, stat.st_size, data, errors)
+        return data, errors
+
+    def is_current(self, song_path: Path, data) -> bool:
+        """True si 'data' es la entrada en caché de 'song_path' y el archivo no ha cambiado."""
+        key = song_path.resolve()
+        try:
+            stat = key.stat()
+        except OSError:
+            return False
+        with self._lock:
+            entry = self._entries.get(key)
+        return bool(entry) and entry[2] is data and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size
+
+    def purge(self, song_path: Path = None):
+        """Elimina una entrada concreta o, sin argumentos, vacía toda la caché."""
+        with self._lock:
+            if song_path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(song_path.resolve(), None)
+
 # --- Global State Instances ---
+persistent_song_cache = PersistentSongCache(user_cache_dir())
 config = {}
 clock_state = ClockState()
 song_state = SongState()
 playlist_state = PlaylistState()
 global_parts_manager = GlobalPartsManager()
+song_data_cache = SongDataCache()
 pending_action = None
 repeat_override_active = False
 part_loop_active = False
@@ -378,8 +817,11 @@ ui_feedback_message = ""
 feedback_expiry_time = 0
 loaded_filename = ""
 previous_song_index = -1
-_last_used_device = None
+parked_part_change = None  # Parte fijada por un SPP con el transporte parado, a la espera de Continue
+compiled_config_triggers = {}  # triggers globales de la config, compilados tras abrir los dispositivos
+config_trigger_devices = {}
 last_triggered_song_index = -1
+clock_tick_lock = threading.RLock()  # Serializa el avance por ticks reales y sintetizados (flywheel)
 midi_inputs = {}
 midi_outputs = {}
 osc_outputs = {}
@@ -442,7 +884,22 @@ def setup_devices(config):
     
     # Puerto de Clock (obligatorio)
     clock_alias = midi_in_aliases.get("clock")
-    if clock_alias:
+    if isinstance(clock_alias, list):
+        # Lista ordenada de fuentes candidatas: se abren todas y el supervisor elige la activa
+        for candidate in clock_alias:
+            port_name = find_port_by_substring(available_in_ports, candidate)
+            if not port_name:
+                print(f"[!] No se encontró la fuente de Clock '{candidate}'.")
+                continue
+            try:
+                clock_supervisor.add_source(port_name, mido.open_input(port_name))
+                print(f"[*] Fuente de Clock candidata abierta en '{port_name}'.")
+            except Exception as e:
+                print(f"[!] Error abriendo fuente de Clock '{port_name}': {e}")
+        if clock_supervisor.active:
+            midi_inputs["clock"] = clock_supervisor.active.port
+            clock_state.source_name = clock_supervisor.active.name
+    elif clock_alias:
         port_name = find_port_by_substring(available_in_ports, clock_alias)
         if port_name:
             try:
@@ -506,6 +963,135 @@ def setup_devices(config):
     _debug_log(f"Final osc_outputs dictionary: {list(osc_outputs.keys())}")
 
 
+class DeviceOutputWorker:
+    """
+    Hilo de envío de un único dispositivo de salida (puerto MIDI o cliente OSC).
+    Dos colas acotadas (deque: append/popleft son atómicos, sin locks): una prioritaria
+    para transporte y reloj, y otra normal para triggers. El orden se conserva dentro de
+    cada cola; los mensajes prioritarios adelantan a los normales pendientes.
+    """
+    def __init__(self, device_name: str, target, max_queue: int):
+        self.device_name = device_name
+        self.target = target
+        self.max_queue = max_queue
+        self.priority_queue = collections.deque()
+        self.normal_queue = collections.deque()
+        self.wakeup = threading.Event()
+        self.running = True
+        # Contadores (solo los escribe el hilo correspondiente; lecturas aproximadas)
+        self.enqueued = 0
+        self.sent = 0
+        self.dropped = 0
+        self.errors = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.thread = threading.Thread(target=self._run, name=f"output-{device_name}", daemon=True)
+        self.thread.start()
+
+    def submit(self, message, error_label: str, priority: bool = False) -> bool:
+        """Encola un mensaje. Si la cola está llena se descarta y se cuenta."""
+        queue = self.priority_queue if priority else self.normal_queue
+        if len(queue) >= self.max_queue:
+            self.dropped += 1
+            return False
+        queue.append((message, error_label, time.perf_counter()))
+        self.enqueued += 1
+        self.wakeup.set()
+        return True
+
+    def depth(self) -> int:
+        return len(self.priority_queue) + len(self.normal_queue)
+
+    def _next_item(self):
+        try:
+            return self.priority_queue.popleft()
+        except IndexError:
+            pass
+        try:
+            return self.normal_queue.popleft()
+        except IndexError:
+            return None
+
+    def _run(self):
+        while True:
+            self.wakeup.wait()
+            self.wakeup.clear()
+            item = self._next_item()
+            while item is not None:
+                message, error_label, enqueued_at = item
+                try:
+                    self.target.send(message)
+                    self.sent += 1
+                except Exception as e:
+                    self.errors += 1
+                    set_feedback_message(f"{error_label}: {e}")
+                latency = time.perf_counter() - enqueued_at
+                self.latency_total += latency
+                if latency > self.latency_max:
+                    self.latency_max = latency
+                item = self._next_item()
+            if not self.running:
+                return
+
+    def stop(self, timeout: float):
+        """Termina el hilo tras vaciar lo que quede en las colas."""
+        self.running = False
+        self.wakeup.set()
+        self.thread.join(timeout=timeout)
+
+    def stats(self) -> dict:
+        done = self.sent + self.errors
+        return {
+            "depth": self.depth(),
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "avg_latency_ms": (self.latency_total / done * 1000) if done else 0.0,
+            "max_latency_ms": self.latency_max * 1000,
+        }
+
+
+class OutputDispatcher:
+    """
+    Reparte los envíos MIDI/OSC a un DeviceOutputWorker por alias de salida, para que
+    el hilo del reloj solo encole y un puerto lento no retrase el conteo de ticks.
+    Mientras no esté arrancado (o tras detenerlo) los envíos se hacen en el momento.
+    """
+    MAX_QUEUE = 256
+
+    def __init__(self):
+        self.workers = {}  # alias -> DeviceOutputWorker
+
+    def start(self):
+        """Crea un worker por cada salida abierta en setup_devices."""
+        for device_name, target in list(midi_outputs.items()) + list(osc_outputs.items()):
+            if device_name not in self.workers:
+                self.workers[device_name] = DeviceOutputWorker(device_name, target, self.MAX_QUEUE)
+
+    def send(self, device_name: str, target, message, error_label: str, priority: bool = False):
+        worker = self.workers.get(device_name)
+        if worker is not None and worker.target is target:
+            worker.submit(message, error_label, priority)
+            return
+        try:
+            target.send(message)
+        except Exception as e:
+            set_feedback_message(f"{error_label}: {e}")
+
+    def stop(self, timeout: float = 0.5):
+        """Vacía las colas pendientes y detiene todos los workers."""
+        workers, self.workers = self.workers, {}
+        for worker in workers.values():
+            worker.stop(timeout)
+
+    def stats(self) -> dict:
+        """Contadores por dispositivo: profundidad de cola, enviados, descartados y latencia."""
+        return {name: worker.stats() for name, worker in self.workers.items()}
+
+output_dispatcher = OutputDispatcher()
+
+
 # --- Core Logic ---
 
 def _resolve_value(value, context):
@@ -539,162 +1125,347 @@ def init_debug_log():
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         f.write(f"=== MIDItema Debug Log Started at {timestamp} ===\n")
 
-def _process_trigger_action(action, context):
+# Claves del contexto de un trigger. En una acción OSC, un string solo se trata como dinámico si
+# es una de ellas; cualquier otro valor se fija al compilar la acción. En una acción MIDI todo
+# parámetro string se resuelve contra el contexto al disparar.
+TRIGGER_CONTEXT_KEYS = frozenset({
+    "song_index", "song_name", "song_color", "part_index", "part_name", "part_bars", "part_color",
+    "part_notes", "part_cue", "part_index_in_setlist", "completed_bar", "current_song_name",
+    "current_part_name", "current_part_index", "block_number", "remaining_beats", "remaining_bars",
+    "playlist_name", "playlist_song_count", "playlist_part_count",
+})
+MIDI_TRIGGER_PARAMS = ("channel", "note", "velocity", "control", "value", "program", "song")
+# Claves que indican cuándo se dispara una acción; no forman parte del mensaje
+TRIGGER_TIMING_KEYS = ("device", "bar", "beats", "each_bar", "each_beat")
+
+
+class CompiledAction:
     """
-    Procesa una única acción de trigger, resolviendo sus valores y enviando
-    el mensaje MIDI u OSC correspondiente. Incluye lógica de inferencia de tipo.
+    Acción de trigger compilada al cargar la config, el setlist o la canción.
+    Guarda el dispositivo ya resuelto (con la herencia aplicada), el puerto o cliente,
+    el mensaje MIDI/OSC construido de antemano y los campos que dependen del contexto.
     """
+    __slots__ = ("device_name", "kind", "port", "message", "dynamic_fields", "address", "args",
+                 "error", "bar", "beats", "each_bar", "each_beat")
+
+    def __init__(self, action: dict, device_name: str):
+        self.device_name = device_name
+        self.kind = None           # "midi", "osc" o None si no hay nada que enviar
+        self.port = None
+        self.message = None        # Mensaje prefabricado (OSC: solo si no tiene valores dinámicos)
+        self.dynamic_fields = ()   # (campo, clave_de_contexto, valor_por_defecto)
+        self.address = None
+        self.args = ()
+        self.error = None
+        self.bar = action.get("bar")
+        self.beats = action.get("beats")
+        self.each_bar = action.get("each_bar")
+        self.each_beat = action.get("each_beat")
+
+        if device_name in midi_outputs:
+            self._compile_midi(action, midi_outputs[device_name])
+        elif device_name in osc_outputs:
+            self._compile_osc(action, osc_outputs[device_name])
+
+    def _compile_midi(self, action: dict, port):
+        msg_params = {k: v for k, v in action.items() if k not in TRIGGER_TIMING_KEYS}
+
+        # Lógica de inferencia si 'type' no está definido
+        if "type" not in msg_params:
+            if "note" in msg_params:
+                msg_params["type"] = "note_on"
+                msg_params.setdefault("velocity", 127) # Valor por defecto
+            elif "control" in msg_params:
+                msg_params["type"] = "control_change"
+                msg_params.setdefault("value", 127) # Valor por defecto
+            elif "program" in msg_params:
+                msg_params["type"] = "program_change"
+            elif "song" in msg_params:
+                msg_params["type"] = "song_select"
+            else:
+                return # No se puede inferir el tipo, se ignora la acción
+
+        # Los parámetros de tipo string se resuelven contra el contexto en cada disparo (un
+        # mensaje MIDI solo admite enteros, así que nunca pueden fijarse al compilar)
+        dynamic_fields = []
+        for param in MIDI_TRIGGER_PARAMS:
+            value = msg_params.get(param)
+            if isinstance(value, str):
+                dynamic_fields.append((param, value, value))
+                del msg_params[param]
+
+        # Lógica de valores implícitos
+        if msg_params["type"] == "program_change" and "program" not in action:
+            dynamic_fields.append(("program", "part_index", 0))
+        elif msg_params["type"] == "song_select" and "song" not in action:
+            dynamic_fields.append(("song", "song_index", 0))
+
+        self.kind = "midi"
+        self.port = port
+        self.dynamic_fields = tuple(dynamic_fields)
+        try:
+            self.message = mido.Message(**{k: v for k, v in msg_params.items() if v is not None})
+        except Exception as e:
+            self.error = str(e)
+
+    def _compile_osc(self, action: dict, client):
+        self.kind = "osc"
+        self.port = client
+        self.address = action.get("address")
+        self.args = tuple(action.get("args", []))
+        is_dynamic = any(isinstance(v, str) and v in TRIGGER_CONTEXT_KEYS for v in (self.address, *self.args))
+        if self.address and not is_dynamic:
+            try:
+                self.message = self._build_osc(self.address, self.args)
+            except Exception as e:
+                self.error = str(e)
+
+    @staticmethod
+    def _build_osc(address, args):
+        builder = osc_message_builder.OscMessageBuilder(address=address)
+        for arg in args:
+            builder.add_arg(arg)
+        return builder.build()
+
+    def fire(self, context: dict):
+        """Envía la acción, parcheando solo los campos que dependen del contexto."""
+        if self.kind == "midi":
+            try:
+                if self.error:
+                    raise ValueError(self.error)
+                msg = self.message
+                if self.dynamic_fields:
+                    overrides = {}
+                    for field, key, default in self.dynamic_fields:
+                        value = context.get(key, default)
+                        if value is not None:
+                            overrides[field] = value
+                    if overrides:
+                        msg = msg.copy(**overrides)
+                output_dispatcher.send(self.device_name, self.port, msg, f"Error MIDI Trigger ({self.device_name})")
+            except Exception as e:
+                set_feedback_message(f"Error MIDI Trigger ({self.device_name}): {e}")
 
+        elif self.kind == "osc":
+            try:
+                if self.error:
+                    raise ValueError(self.error)
+                msg = self.message
+                if msg is None:
+                    address = _resolve_value(self.address, context)
+                    if not address:
+                        _debug_log(f"No address found in action")
+                        return
+                    msg = self._build_osc(address, [_resolve_value(arg, context) for arg in self.args])
+                _debug_log(f"Sending OSC to '{self.device_name}': {msg.address} with args: {msg.params}")
+                output_dispatcher.send(self.device_name, self.port, msg, f"Error OSC Trigger ({self.device_name})")
+            except Exception as e:
+                _debug_log(f"OSC Error: {e}")
+                set_feedback_message(f"Error OSC Trigger ({self.device_name}): {e}")
 
-    global _last_used_device
+        elif self.device_name not in midi_outputs and self.device_name not in osc_outputs:
+            _debug_log(f"Device '{self.device_name}' not found in MIDI or OSC outputs")
 
-    # DEBUG: Write to file
-    _debug_log(f"Processing trigger action: {action}")
-    _debug_log(f"Context: {context}")
 
-    device_name = action.get("device")
+def compile_action_list(actions, inherited_device=None):
+    """
+    Compila una lista de acciones aplicando la herencia de 'device': una acción sin
+    dispositivo usa el de la anterior (o 'inherited_device' si es la primera).
+    Devuelve (acciones_compiladas, último_dispositivo).
+    """
+    if isinstance(actions, dict):
+        actions = [actions]
+    if not isinstance(actions, list):
+        return [], inherited_device
+
+    compiled = []
+    device_name = inherited_device
+    for action in actions:
+        if not isinstance(action, dict):
+            continue
+        if action.get("device"):
+            device_name = action["device"]
+        compiled.append(CompiledAction(action, device_name or "MIDItema"))
+    return compiled, device_name
 
-    if device_name:
-        # Si se especifica un dispositivo, lo usamos y lo guardamos como el último usado.
-        _last_used_device = device_name
-    else:
-        # Si no se especifica, heredamos el último que se usó.
-        if _last_used_device:
-            device_name = _last_used_device
-        else:
-            # No hay dispositivo en la acción y nunca se ha definido uno. No se puede procesar.
-            device_name = "MIDItema"
 
-    if device_name in midi_outputs:
-        port = midi_outputs[device_name]
-        try:
-            # Hacemos una copia para no modificar el diccionario original
-            msg_params = action.copy()
-
-            # Lógica de inferencia si 'type' no está definido
-            if "type" not in msg_params:
-                if "note" in msg_params:
-                    msg_params["type"] = "note_on"
-                    if "velocity" not in msg_params:
-                        msg_params["velocity"] = 127 # Valor por defecto
-                elif "control" in msg_params:
-                    msg_params["type"] = "control_change"
-                    if "value" not in msg_params:
-                        msg_params["value"] = 127 # Valor por defecto
-                elif "program" in msg_params:
-                    msg_params["type"] = "program_change"
-                elif "song" in msg_params:
-                    msg_params["type"] = "song_select"
-                else:
-                    return # No se puede inferir el tipo, se ignora la acción
-
-            # Resolver parámetros comunes usando el contexto
-            for param in ["channel", "note", "velocity", "control", "value", "program", "song"]:
-                if param in msg_params:
-                    msg_params[param] = _resolve_value(msg_params[param], context)
-
-            # Lógica de valores implícitos (se mantiene)
-            if msg_params["type"] == "program_change" and "program" not in msg_params:
-                msg_params["program"] = context.get("part_index", 0)
-            elif msg_params["type"] == "song_select" and "song" not in msg_params:
-                msg_params["song"] = context.get("song_index", 0)
-            
-            # Filtrar parámetros nulos y construir el mensaje
-            final_params = {k: v for k, v in msg_params.items() if v is not None and k != 'device'}
-            msg = mido.Message(**final_params)
-            port.send(msg)
+def compile_triggers(triggers: dict, inherited_devices: dict = None):
+    """
+    Compila un diccionario {evento: [acciones]}. Por evento, la herencia de dispositivo
+    continúa desde la capa anterior (config -> setlist -> canción).
+    Devuelve (triggers_compilados, último_dispositivo_por_evento).
+    """
+    inherited_devices = inherited_devices or {}
+    compiled = {}
+    last_devices = dict(inherited_devices)
+    for event_name, actions in (triggers or {}).items():
+        compiled[event_name], last_devices[event_name] = compile_action_list(actions, inherited_devices.get(event_name))
+    return compiled, last_devices
 
-        except Exception as e:
-            set_feedback_message(f"Error MIDI Trigger ({device_name}): {e}")
 
-    elif device_name in osc_outputs:
-        # La lógica OSC no necesita inferencia y se mantiene igual
-        client = osc_outputs[device_name]
-        _debug_log(f"Sending OSC message to device '{device_name}'")
-        try:
-            address = _resolve_value(action.get("address"), context)
-            if not address: 
-                _debug_log(f"No address found in action")
-                return
+def compile_config_triggers():
+    """Compila los triggers globales de la config (con los dispositivos ya abiertos)."""
+    global compiled_config_triggers, config_trigger_devices
+    compiled_config_triggers, config_trigger_devices = compile_triggers(config.get("triggers", {}))
+    trigger_registry.rebuild()
+
+
+def compile_playlist_triggers():
+    """Compila los triggers del setlist activo, heredando dispositivos de la config."""
+    playlist_state.compiled_triggers, playlist_state.trigger_devices = compile_triggers(
+        playlist_state.triggers, config_trigger_devices)
+    trigger_registry.rebuild()
+
+
+def compile_song_triggers(state=None):
+    """
+    Compila los triggers y los 'output' de cada parte de 'state' (por defecto, la
+    canción actual). Solo reindexa el TriggerRegistry si 'state' es la canción actual;
+    un estado preparado en segundo plano se indexa al instalarlo.
+    """
+    state = state or song_state
+    inherited = playlist_state.trigger_devices if playlist_state.is_active else config_trigger_devices
+    state.compiled_triggers, song_devices = compile_triggers(state.triggers, inherited)
+    # Los outputs de parte se disparan justo después de los triggers de 'part_change'
+    part_change_device = song_devices.get("part_change")
+    state.compiled_part_outputs = [
+        compile_action_list(part.get("output", []), part_change_device)[0] for part in state.parts
+    ]
+    if state is song_state:
+        trigger_registry.rebuild()
+
+
+class TriggerRegistry:
+    """
+    Índice de los triggers compilados de las tres capas (config, setlist, canción),
+    fusionados en orden de prioridad y agrupados por evento y por adelanto en beats.
+    Cada capa se reindexa solo cuando cambia su diccionario compilado, el compás de la
+    canción (los 'bar' se convierten a beats) o el adelanto por defecto del setlist.
+    """
+    DEFAULT_DELAY_EVENTS = ("part_change", "song_change")
+
+    def __init__(self):
+        self._layer_cache = {}     # capa -> (triggers_compilados, parámetros, índice)
+        self.all_actions = {}      # evento -> [CompiledAction] (disparo forzado)
+        self.instant_actions = {}  # evento -> [CompiledAction] sin adelanto
+        self.delayed_actions = {}  # evento -> {beats_de_adelanto: [CompiledAction]}
+        # Calendarios rítmicos memoizados: solo dependen del número de compás / de los beats
+        # que faltan para el evento, así que se rellenan bajo demanda y valen para todas las partes
+        self._bar_schedule = {}        # compás completado -> ((CompiledAction, block_number), ...)
+        self._countdown_schedule = {}  # beats restantes -> (CompiledAction, ...)
+
+    def _index_layer(self, triggers: dict, sig_num: int, default_delay):
+        all_actions, instant, delayed = {}, {}, {}
+        for event_name, actions in triggers.items():
+            all_actions[event_name] = list(actions)
+            for action in actions:
+                if action.bar is not None:
+                    delay = action.bar * sig_num
+                elif action.beats is not None:
+                    delay = action.beats
+                else:
+                    # Sin adelanto propio: cuenta como instantáneo y, para cambios de
+                    # parte/canción dentro de un setlist, también con el adelanto del setlist
+                    instant.setdefault(event_name, []).append(action)
+                    if default_delay and event_name in self.DEFAULT_DELAY_EVENTS:
+                        delayed.setdefault(event_name, {}).setdefault(default_delay, []).append(action)
+                    continue
+                if delay == 0:
+                    instant.setdefault(event_name, []).append(action)
+                elif delay > 0:
+                    delayed.setdefault(event_name, {}).setdefault(delay, []).append(action)
+        return all_actions, instant, delayed
+
+    def rebuild(self):
+        """Refusiona las capas activas, reindexando solo las que han cambiado."""
+        sig_num = song_state.time_signature_numerator
+        default_delay = playlist_state.beats if playlist_state.is_active else 0
+        layers = [("config", compiled_config_triggers)]
+        if playlist_state.is_active:
+            layers.append(("playlist", playlist_state.compiled_triggers))
+        layers.append(("song", song_state.compiled_triggers))
+
+        all_actions, instant, delayed = {}, {}, {}
+        for name, triggers in layers:
+            params = (sig_num, default_delay)
+            cached = self._layer_cache.get(name)
+            if cached is None or cached[0] is not triggers or cached[1] != params:
+                cached = (triggers, params, self._index_layer(triggers, sig_num, default_delay))
+                self._layer_cache[name] = cached
+            layer_all, layer_instant, layer_delayed = cached[2]
+            for event_name, actions in layer_all.items():
+                all_actions.setdefault(event_name, []).extend(actions)
+            for event_name, actions in layer_instant.items():
+                instant.setdefault(event_name, []).extend(actions)
+            for event_name, buckets in layer_delayed.items():
+                merged = delayed.setdefault(event_name, {})
+                for delay, actions in buckets.items():
+                    merged.setdefault(delay, []).extend(actions)
+
+        self.all_actions, self.instant_actions, self.delayed_actions = all_actions, instant, delayed
+        self._bar_schedule = {}
+        self._countdown_schedule = {}
+
+    def due(self, event_name, remaining_beats):
+        """Acciones de 'event_name' cuyo adelanto coincide exactamente con 'remaining_beats'."""
+        return self.delayed_actions.get(event_name, {}).get(remaining_beats, ())
+
+    def bar_actions(self, completed_bar):
+        """bar_triggers que tocan al completar 'completed_bar', con su número de bloque."""
+        scheduled = self._bar_schedule.get(completed_bar)
+        if scheduled is None:
+            scheduled = ()
+            if completed_bar > 0:
+                scheduled = tuple(
+                    (action, completed_bar // action.each_bar)
+                    for action in self.all_actions.get("bar_triggers", ())
+                    if action.each_bar and completed_bar % action.each_bar == 0
+                )
+            self._bar_schedule[completed_bar] = scheduled
+        return scheduled
+
+    def countdown_actions(self, remaining_beats):
+        """countdown_triggers activos cuando faltan 'remaining_beats' para el evento."""
+        scheduled = self._countdown_schedule.get(remaining_beats)
+        if scheduled is None:
+            scheduled = ()
+            if remaining_beats > 0:
+                scheduled = tuple(
+                    action for action in self.all_actions.get("countdown_triggers", ())
+                    if action.each_beat and remaining_beats <= action.each_beat
+                )
+            self._countdown_schedule[remaining_beats] = scheduled
+        return scheduled
+
+trigger_registry = TriggerRegistry()
 
-            builder = osc_message_builder.OscMessageBuilder(address=address)
-            raw_args = action.get("args", [])
-            resolved_args = []
-            for arg in raw_args:
-                resolved_arg = _resolve_value(arg, context)
-                resolved_args.append(resolved_arg)
-                builder.add_arg(resolved_arg)
-            
-            msg = builder.build()
-            _debug_log(f"Sending OSC: {address} with args: {resolved_args}")
-            client.send(msg)
-            _debug_log(f"OSC message sent successfully")
 
-        except Exception as e:
-            _debug_log(f"OSC Error: {e}")
-            set_feedback_message(f"Error OSC Trigger ({device_name}): {e}")
-    else:
-        _debug_log(f"Device '{device_name}' not found in MIDI or OSC outputs")
-        _debug_log(f"Available MIDI devices: {list(midi_outputs.keys())}")
-        _debug_log(f"Available OSC devices: {list(osc_outputs.keys())}")
-            
 def fire_triggers(event_name, context, is_delayed_check=False, remaining_beats=0, force_instant=False):
     """
     Busca y ejecuta todos los triggers asociados a un evento, fusionando Global, Playlist y Song.
     """
     _debug_log(f"fire_triggers called: event={event_name}, delayed={is_delayed_check}, beats={remaining_beats}")
 
-    # Recolectar fuentes de triggers en orden de prioridad
-    trigger_sources = []
-    if "triggers" in config: trigger_sources.append(config["triggers"])
-    if playlist_state.is_active and playlist_state.triggers: trigger_sources.append(playlist_state.triggers)
-    if song_state.triggers: trigger_sources.append(song_state.triggers)
-
-    # 1. Procesar triggers de eventos (Global + Playlist + Song)
-    for source in trigger_sources:
-        if event_name in source:
-            actions = source[event_name]
-            # CORRECCIÓN: Usar enumerate para definir 'i' y corregir indentación
-            for i, action in enumerate(actions):
-                delay_in_beats = 0
-                if "bar" in action: 
-                    delay_in_beats = action["bar"] * song_state.time_signature_numerator
-                elif "beats" in action: 
-                    delay_in_beats = action["beats"]
-                elif event_name in ["part_change", "song_change"] and is_delayed_check and playlist_state.is_active:
-                    # Usar beats del setlist para cambios de parte/canción si no hay delay específico
-                    delay_in_beats = playlist_state.beats
-
-                should_fire = False
-                if force_instant: should_fire = True
-                elif is_delayed_check:
-                    if delay_in_beats > 0 and delay_in_beats == remaining_beats: should_fire = True
-                else:
-                    if delay_in_beats == 0: should_fire = True
-                
-                _debug_log(f"Action {i}: delay={delay_in_beats}, should_fire={should_fire}, force_instant={force_instant}, is_delayed_check={is_delayed_check}")
-                
-                if should_fire:
-                    _debug_log(f"Firing action {i}")
-                    _process_trigger_action(action, context)
-                else:
-                    _debug_log(f"Skipping action {i}")
-                
-        _debug_log(f"Finished processing actions for '{event_name}'")
+    # 1. Procesar triggers de eventos (Global + Playlist + Song), ya indexados por adelanto
+    if force_instant:
+        actions = trigger_registry.all_actions.get(event_name, ())
+    elif is_delayed_check:
+        actions = trigger_registry.due(event_name, remaining_beats) if remaining_beats > 0 else ()
+    else:
+        actions = trigger_registry.instant_actions.get(event_name, ())
+
+    _debug_log(f"{len(actions)} actions due for '{event_name}'")
+    for action in actions:
+        action.fire(context)
 
     # 2. Procesar triggers locales de la parte (nueva funcionalidad)
     # CORRECCIÓN: Los triggers locales también deben respetar el adelanto configurado
     if event_name == "part_change":
         current_part_index = context.get("part_index")
-        if current_part_index is not None and 0 <= current_part_index < len(song_state.parts):
-            part_data = song_state.parts[current_part_index]
-            local_actions = part_data.get("output", []) # Esperamos una lista
-            
-            # Asegurarse de que siempre sea una lista para un procesamiento uniforme
-            if isinstance(local_actions, dict):
-                local_actions = [local_actions]
+        if current_part_index is not None and 0 <= current_part_index < len(song_state.compiled_part_outputs):
+            local_actions = song_state.compiled_part_outputs[current_part_index]
 
-            if isinstance(local_actions, list):
+            if local_actions:
                 # Calcular el delay para triggers locales (igual que globales)
                 delay_in_beats = playlist_state.beats if playlist_state.is_active else 0
                 
@@ -710,7 +1481,7 @@ def fire_triggers(event_name, context, is_delayed_check=False, remaining_beats=0
                 
                 if should_fire_local and not context.get("skip_outputs", False) and outputs_enabled and not silent_mode:
                     for action in local_actions:
-                        _process_trigger_action(action, context)                     
+                        action.fire(context)
 
 def load_config(conf_filename: str):
     """Carga la configuración del alias del dispositivo desde el archivo .conf."""
@@ -721,8 +1492,8 @@ def load_config(conf_filename: str):
             print(f"[!] El archivo de configuración '{conf_filename}' no fue encontrado.")
         return {} # Devuelve un diccionario vacío si no existe
     try:
-        with conf_path.open('r', encoding='utf-8') as f:
-            config = json5.load(f)
+        config, parse_path = json_loader.loads_with_path(conf_path.read_text(encoding='utf-8'))
+        _debug_log(f"Config '{conf_filename}' parseada por la vía '{parse_path}'")
         print(f"[*] Archivo de configuración '{conf_filename}' cargado.")
         return config
     except Exception as e:
@@ -738,20 +1509,20 @@ def normalize_repeat_pattern(pattern):
         return False
     return pattern
 
-def load_song_file(filepath: Path = None, data: dict = None):
+def load_song_file(filepath: Path = None, data: dict = None, errors: list = None):
     """
     Carga y valida una canción, actualizando el SongState.
     Puede cargar desde un diccionario (data) o desde un archivo (filepath).
+    'errors' son los errores de validación de 'data' si ya se conocen (p. ej. los
+    de song_data_cache); en ese caso no se vuelve a validar.
     """
-    global song_state
-    _last_used_device = None
-    
     song_data = None
     if data:
         # Priorizar los datos si se proporcionan directamente
         song_data = data
         # Validar datos proporcionados
-        errors = MIDItemaValidator.validate_data(data)
+        if errors is None:
+            errors = MIDItemaValidator.validate_data(data)
         if errors:
             error_msg = "Errores de validación:\n" + "\n".join(str(e) for e in errors[:3])
             if len(errors) > 3:
@@ -760,8 +1531,8 @@ def load_song_file(filepath: Path = None, data: dict = None):
             return False
     elif filepath:
         # Si no hay datos, leer desde el archivo
-        is_valid, errors, song_data = MIDItemaValidator.validate_file(filepath)
-        if not is_valid:
+        song_data, errors = song_data_cache.load_validated(filepath)
+        if song_data is None or errors:
             error_msg = "Errores en el archivo:\n" + "\n".join(str(e) for e in errors[:3])
             if len(errors) > 3:
                 error_msg += f"\n... y {len(errors) - 3} errores más"
@@ -775,37 +1546,243 @@ def load_song_file(filepath: Path = None, data: dict = None):
     if not song_data:
         return False
 
-    song_state = SongState() # Resetear estado al cargar nueva canción
-    song_state.song_name = song_data.get("song_name", filepath.stem if filepath else "Canción Incrustada")
-    song_state.song_color = song_data.get("color")
-    song_state.triggers = song_data.get("triggers", {})  # Cargar triggers de canción
-    song_state.parts = song_data.get("parts", [])
+    state = build_song_state(song_data, filepath)
+    if state is None:
+        return False
+    install_song_state(state)
+    # print(f"[*] Canción '{song_state.song_name}' cargada. ({len(song_state.parts)} partes)")
+    return True
 
-    for part in song_state.parts:
+
+def build_song_state(song_data: dict, filepath: Path = None):
+    """
+    Construye un SongState nuevo a partir de datos ya validados, con triggers
+    compilados y grafo de transiciones, sin tocar el estado global (se puede llamar
+    desde el hilo de prefetch). Devuelve None si la canción no tiene partes.
+    """
+    state = SongState()
+    state.song_name = song_data.get("song_name", filepath.stem if filepath else "Canción Incrustada")
+    state.song_color = song_data.get("color")
+    state.bpm = song_data.get("bpm")
+    state.triggers = song_data.get("triggers", {})  # Cargar triggers de canción
+    state.parts = song_data.get("parts", [])
+
+    if not state.parts or not isinstance(state.parts, list):
+        print(f"Error: La canción '{state.song_name}' no tiene una lista de 'parts' válida.")
+        return None
+
+    for part in state.parts:
         if "repeat_pattern" in part:
             part["repeat_pattern"] = normalize_repeat_pattern(part["repeat_pattern"])
-   
-    if not song_state.parts or not isinstance(song_state.parts, list):
-        print(f"Error: La canción '{song_state.song_name}' no tiene una lista de 'parts' válida.")
-        return False
 
     # Interpretar Time Signature
     try:
         sig = song_data.get("time_signature", "4/4").split('/')
-        song_state.time_signature_numerator = int(sig[0])
+        state.time_signature_numerator = int(sig[0])
     except (ValueError, IndexError):
-        song_state.time_signature_numerator = 4
+        state.time_signature_numerator = 4
 
     # Interpretar Time Division
     division = song_data.get("time_division", "1/4")
     division_map = {"1/4": 24, "1/8": 12, "1/16": 6}
-    song_state.ticks_per_song_beat = division_map.get(division, MIDI_PPQN)
+    state.ticks_per_song_beat = division_map.get(division, MIDI_PPQN)
+
+    # Sumas acumuladas de beats por parte: posición absoluta de cada parte para el SPP
+    beat_offsets = [0]
+    for part in state.parts:
+        beat_offsets.append(beat_offsets[-1] + part.get("bars", 0) * state.time_signature_numerator)
+    state.part_beat_offsets = beat_offsets
+
+    # Precompilar triggers y outputs de parte (mensajes y puertos ya resueltos)
+    compile_song_triggers(state)
+    # Compilar el grafo de transiciones (queda en caché para la instalación)
+    _get_transition_graph(state.parts)
+    return state
+
+
+def install_song_state(state):
+    """Hace de 'state' la canción actual: cambio de referencia y reindexado de triggers."""
+    global song_state, parked_part_change
+    song_state = state
+    parked_part_change = None
+    trigger_registry.rebuild()
+
+    # Avisar (una vez por canción compilada) de bucles infinitos sobre partes sin compases
+    graph = _get_transition_graph(song_state.parts)
+    if not graph.warnings_reported:
+        graph.warnings_reported = True
+        for warning in graph.warnings:
+            _debug_log(f"Song '{song_state.song_name}': {warning}")
+            set_feedback_message(f"[!] {song_state.song_name}: {warning}")
+
+    # En una playlist el índice global se construye al cargarla; al cambiar de canción solo
+    # se actualiza la entrada de esta si sus partes han cambiado (p. ej. archivo editado)
+    if playlist_state.is_active:
+        global_parts_manager.refresh_song(playlist_state.current_song_index, song_state.parts)
+    else:
+        global_parts_manager.build_global_parts_list()
+
+
+class PreparedSong:
+    """Canción del setlist leída, validada y compilada por SongPrefetcher."""
+    __slots__ = ("song_index", "element", "song_path", "source_data", "state", "song_name")
+
+    def __init__(self, song_index, element, song_path, source_data, state, song_name):
+        self.song_index = song_index
+        self.element = element
+        self.song_path = song_path
+        self.source_data = source_data
+        self.state = state
+        self.song_name = song_name
+
+    def is_current(self) -> bool:
+        """Sigue valiendo si el elemento del setlist y el archivo no han cambiado."""
+        elements = playlist_state.playlist_elements
+        if not (0 <= self.song_index < len(elements)) or elements[self.song_index] is not self.element:
+            return False
+        return self.song_path is None or song_data_cache.is_current(self.song_path, self.source_data)
+
+
+def prepare_playlist_song(song_index: int, elements: list):
+    """
+    Lee, valida y compila la canción 'song_index' del setlist sin tocar el estado
+    global. Devuelve un PreparedSong o None si hay algún error (la carga normal lo
+    volverá a intentar y lo notificará).
+    """
+    element = elements[song_index]
+    song_path = None
+    if "filepath" in element:
+        song_path = SONGS_DIR / element["filepath"]
+        if not song_path.is_file():
+            return None
+        song_data, errors = song_data_cache.load_validated(song_path)
+        if song_data is None:
+            return None
+        song_name = song_data.get("song_name", song_path.stem)
+    elif "parts" in element:
+        song_data = element
+        song_name = song_data.get("song_name", "Canción Incrustada")
+        errors = MIDItemaValidator.validate_data(song_data)
+    else:
+        return None
+    if errors:
+        return None
+    state = build_song_state(song_data)
+    if state is None:
+        return None
+    return PreparedSong(song_index, element, song_path, song_data, state, song_name)
 
-    # Rebuild global parts list when song is loaded
-    global_parts_manager.build_global_parts_list()
-    
-    # print(f"[*] Canción '{song_state.song_name}' cargada. ({len(song_state.parts)} partes)")
-    return True
+
+class SongPrefetcher:
+    """
+    Prepara en segundo plano la siguiente canción del setlist y la de destino de un
+    salto pendiente (lectura, parseo, validación y compilación), de modo que el cambio
+    de canción en el hilo del reloj se reduce a instalar un SongState ya construido.
+    """
+    MAX_READY = 4
+    SETTLE = 0.02  # Espera tras un encargo para no competir por el GIL con el beat en curso
+
+    def __init__(self):
+        self._ready = {}          # índice de canción -> PreparedSong
+        self._requested = set()
+        self._queue = collections.deque()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self.thread = None
+        self.hits = 0
+        self.misses = 0
+
+    def request(self, song_index: int):
+        if not playlist_state.is_active or not (0 <= song_index < len(playlist_state.playlist_elements)):
+            return
+        with self._lock:
+            if song_index in self._ready or song_index in self._requested:
+                return
+            self._requested.add(song_index)
+            self._queue.append(song_index)
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="song-prefetch", daemon=True)
+            self.thread.start()
+        self._wakeup.set()
+
+    def watch(self):
+        """Llamado en cada beat: pide la siguiente canción y la de un salto pendiente."""
+        if not playlist_state.is_active:
+            return
+        self.request(playlist_state.current_song_index + 1)
+        if pending_action:
+            target_song = _pending_target_song(pending_action)
+            if target_song is not None:
+                self.request(target_song)
+
+    def take(self, song_index: int):
+        """Devuelve la canción preparada si sigue siendo válida (y la retira), o None."""
+        with self._lock:
+            prepared = self._ready.pop(song_index, None)
+        if prepared is None or not prepared.is_current():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return prepared
+
+    def clear(self):
+        with self._lock:
+            self._ready.clear()
+            self._requested.clear()
+            self._queue.clear()
+
+    def _run(self):
+        while not SHUTDOWN_FLAG:
+            if not self._wakeup.wait(0.5):
+                continue
+            self._wakeup.clear()
+            time.sleep(self.SETTLE)
+            while True:
+                with self._lock:
+                    if not self._queue:
+                        break
+                    song_index = self._queue.popleft()
+                elements = playlist_state.playlist_elements
+                try:
+                    prepared = prepare_playlist_song(song_index, elements)
+                except Exception as e:
+                    _debug_log(f"Prefetch de la canción {song_index} fallido: {e}")
+                    prepared = None
+                with self._lock:
+                    self._requested.discard(song_index)
+                    if prepared is not None and elements is playlist_state.playlist_elements:
+                        self._ready[song_index] = prepared
+                        while len(self._ready) > self.MAX_READY:
+                            self._ready.pop(next(iter(self._ready)))
+
+song_prefetcher = SongPrefetcher()
+
+
+def _pending_target_song(action: dict):
+    """Índice de la canción de destino de una acción pendiente, o None si no cambia de canción."""
+    if action.get("target_type") in ("global_part", "cue_jump"):
+        return action.get("target_song")
+    if action.get("target_type") == "song":
+        target = action.get("target")
+        if isinstance(target, int):
+            return target
+        if isinstance(target, dict) and target.get("type") == "relative":
+            return playlist_state.current_song_index + target.get("value", 0)
+    return None
+
+
+def _fire_song_change(song_index: int, song_name: str, song_color):
+    """Dispara 'song_change' para la canción que se va a cargar, una sola vez por canción."""
+    global last_triggered_song_index
+    if last_triggered_song_index != song_index:
+        context = {
+            "song_index": song_index,
+            "song_name": song_name,
+            "song_color": song_color,
+            "part_index": 0
+        }
+        fire_triggers("song_change", context)
+        last_triggered_song_index = song_index
 
 
 def load_song_from_playlist(song_index: int):
@@ -822,9 +1799,18 @@ def load_song_from_playlist(song_index: int):
         return False
     
     playlist_state.current_song_index = song_index
+
+    # Camino rápido: la canción ya está preparada en segundo plano
+    prepared = song_prefetcher.take(song_index)
+    if prepared is not None:
+        _fire_song_change(song_index, prepared.song_name, prepared.source_data.get("color"))
+        install_song_state(prepared.state)
+        return True
+
     element = playlist_state.playlist_elements[song_index]
     
     song_data_to_load = None
+    song_errors = None
     song_name_for_osc = "N/A"
 
     if "filepath" in element:
@@ -840,17 +1826,15 @@ def load_song_from_playlist(song_index: int):
                 return load_song_from_playlist(song_index + 1)
             return False
         
-        try:
-            with song_path.open('r', encoding='utf-8') as f:
-                song_data_to_load = json5.load(f)
-            # Sobrescribir el nombre si está definido dentro del archivo
-            if "song_name" in song_data_to_load:
-                song_name_for_osc = song_data_to_load["song_name"]
-        except Exception as e:
-            error_msg = f"Error al parsear '{element['filepath']}': {e}"
+        song_data_to_load, song_errors = song_data_cache.load_validated(song_path)
+        if song_data_to_load is None:
+            error_msg = f"Error al parsear '{element['filepath']}': {song_errors[0].message}"
             print(f"[!] {error_msg}")
             set_feedback_message(f"[!] Error en archivo JSON")
             return False
+        # Sobrescribir el nombre si está definido dentro del archivo
+        if "song_name" in song_data_to_load:
+            song_name_for_osc = song_data_to_load["song_name"]
             
     elif "parts" in element:
         # Esto mantiene la compatibilidad con canciones incrustadas en la playlist
@@ -862,19 +1846,10 @@ def load_song_from_playlist(song_index: int):
         set_feedback_message(f"[!] Elemento de playlist inválido")
         return False
 
-    context = {
-        "song_index": song_index,
-        "song_name": song_name_for_osc,
-        "song_color": song_data_to_load.get("color"),
-        "part_index": 0
-    }
-    global last_triggered_song_index
-    if last_triggered_song_index != song_index:
-        fire_triggers("song_change", context)
-        last_triggered_song_index = song_index
+    _fire_song_change(song_index, song_name_for_osc, song_data_to_load.get("color"))
 
     # Ahora, cargar la canción en el estado global usando los datos recién leídos.
-    if not load_song_file(data=song_data_to_load):
+    if not load_song_file(data=song_data_to_load, errors=song_errors):
         # El error específico ya se mostró en load_song_file
         print(f"[!] No se pudo cargar la canción desde el elemento {song_index} de la playlist")
         
@@ -885,9 +1860,8 @@ def load_song_from_playlist(song_index: int):
 def reset_song_state_on_stop():
     """Resetea el estado de la secuencia cuando el reloj se detiene."""
     # print("DEBUG: reset_song_state_on_stop -> Reseteando contadores de canción")
-    global _last_used_device, previous_song_index
-    # _last_used_device = None
-    previous_song_index = -1 
+    global previous_song_index
+    previous_song_index= -1 
     song_state.current_part_index = -1
     song_state.remaining_beats_in_part = 0
     song_state.start_time = 0
@@ -895,15 +1869,20 @@ def reset_song_state_on_stop():
     song_state.pass_count = 0
     song_state.midi_clock_tick_counter = 0
     song_state.current_bar_in_part = 0
-    clock_state.tick_times = []
-    clock_state.bpm = 0.0
+    clock_state.reset_tempo()
+    clock_flywheel.reset()
 
 
-def process_song_tick():
-    """Llamado en cada "beat" de la canción (definido por time_division)."""
+def process_song_tick(tick_time: float = None):
+    """
+    Llamado en cada "beat" de la canción (definido por time_division).
+    'tick_time' es la hora de llegada (perf_counter) del tick que cierra el beat.
+    """
     global beat_flash_end_time
     if clock_state.status != "PLAYING" or song_state.current_part_index == -1:
         return
+    clock_state.last_beat_time = clock_state.last_tick_time if tick_time is None else tick_time
+    song_prefetcher.watch()
 
     # --- 1. Calcular estado y beats restantes ---
     sig_num = song_state.time_signature_numerator
@@ -966,46 +1945,34 @@ def process_song_tick():
 
 # --- 5. Disparar Triggers Cíclicos, de Cuenta Atrás y Actualizar UI ---
     
-    # Recolectar fuentes de triggers (Global + Playlist + Song)
-    trigger_sources = []
-    if "triggers" in config: trigger_sources.append(config["triggers"])
-    if playlist_state.is_active and playlist_state.triggers: trigger_sources.append(playlist_state.triggers)
-    if song_state.triggers: trigger_sources.append(song_state.triggers)
-
     if beats_elapsed_in_part > 0 and beats_elapsed_in_part % sig_num == 0:
         song_state.current_bar_in_part = beats_elapsed_in_part // sig_num
         
-        bar_context = {
-            "completed_bar": song_state.current_bar_in_part, "current_song_name": song_state.song_name,
-            "current_part_name": current_part.get("name"), "current_part_index": song_state.current_part_index
-        }
-        
-        # Procesar bar_triggers de todas las fuentes
-        for source in trigger_sources:
-            for action in source.get("bar_triggers", []):
-                bar_interval = action.get("each_bar")
-                if bar_interval and song_state.current_bar_in_part > 0 and song_state.current_bar_in_part % bar_interval == 0:
-                    action_context = bar_context.copy()
-                    action_context["block_number"] = song_state.current_bar_in_part // bar_interval
-                    _process_trigger_action(action, action_context)
+        # Procesar bar_triggers de todas las fuentes (Global + Playlist + Song) que tocan en este compás
+        due_bar_actions = trigger_registry.bar_actions(song_state.current_bar_in_part)
+        if due_bar_actions:
+            bar_context = {
+                "completed_bar": song_state.current_bar_in_part, "current_song_name": song_state.song_name,
+                "current_part_name": current_part.get("name"), "current_part_index": song_state.current_part_index
+            }
+            for action, block_number in due_bar_actions:
+                action_context = bar_context.copy()
+                action_context["block_number"] = block_number
+                action.fire(action_context)
         
         if song_state.remaining_beats_in_part > 0:
             beat_flash_end_time = time.time() + 0.1
 
-    # Disparar countdown_triggers en cada beat
-    countdown_context = {
-        "remaining_beats": remaining_beats_to_event, "remaining_bars": math.ceil(remaining_beats_to_event / sig_num),
-        "current_song_name": song_state.song_name, "current_part_name": current_part.get("name"),
-        "current_part_index": song_state.current_part_index
-    }
-    
-    # Procesar countdown_triggers de todas las fuentes
-    for source in trigger_sources:
-        for action in source.get("countdown_triggers", []):
-            beat_interval = action.get("each_beat")
-            # La condición es más clara: si los beats restantes están dentro del intervalo deseado
-            if beat_interval and 0 < remaining_beats_to_event <= beat_interval:
-                 _process_trigger_action(action, countdown_context)
+    # Disparar countdown_triggers en cada beat: solo los que cubren los beats restantes hasta el evento
+    due_countdown_actions = trigger_registry.countdown_actions(remaining_beats_to_event)
+    if due_countdown_actions:
+        countdown_context = {
+            "remaining_beats": remaining_beats_to_event, "remaining_bars": math.ceil(remaining_beats_to_event / sig_num),
+            "current_song_name": song_state.song_name, "current_part_name": current_part.get("name"),
+            "current_part_index": song_state.current_part_index
+        }
+        for action in due_countdown_actions:
+            action.fire(countdown_context)
 
     # --- 6. Comprobar Fin de Parte ---
     if song_state.remaining_beats_in_part <= 0:
@@ -1013,10 +1980,10 @@ def process_song_tick():
 
 # --- Dynamic Part-Jumping Logic ---
 
-def _find_next_valid_part_index(parts: list, direction: str, start_index: int, start_pass_count: int, repeat_override: bool):
+def _scan_next_valid_part_index(parts: list, direction: str, start_index: int, start_pass_count: int, repeat_override: bool):
     """
-    Encuentra el índice y el pass_count de la siguiente parte válida.
-    (Réplica de la lógica original)
+    Encuentra el índice y el pass_count de la siguiente parte válida recorriendo las partes.
+    (Réplica de la lógica original; SongTransitionGraph la usa para rellenar su tabla)
     """
     if not parts:
         return None, None
@@ -1046,7 +2013,7 @@ def _find_next_valid_part_index(parts: list, direction: str, start_index: int, s
             
             # En fase de bucle (pass_count > 0) y Loop Mode
             else:
-                pattern = part.get("repeat_pattern")
+                pattern = normalize_repeat_pattern(part.get("repeat_pattern"))
                 if pattern is True or pattern == "repeat":
                     return temp_index, temp_pass_count
                 if isinstance(pattern, list) and pattern:
@@ -1056,9 +2023,171 @@ def _find_next_valid_part_index(parts: list, direction: str, start_index: int, s
 
     return None, None
 
+
+class SongTransitionGraph:
+    """
+    Tabla de transiciones precompilada de una canción, indexada por
+    (índice_de_inicio, dirección, pass_count reducido, repeat_override).
+
+    La validez de una parte en fase de bucle depende de (pass_count - 1) módulo la longitud
+    de su patrón, así que basta con el MCM de esas longitudes (el 'periodo'). Un recorrido
+    da como mucho dos vueltas y, hacia atrás, pass_count se satura en 0, por eso los
+    pass_count 0, 1 y 2 se guardan tal cual y el resto se reduce módulo el periodo.
+    Cada entrada guarda (índice_destino, incremento_de_pass_count) o None.
+    """
+    EXACT_PASS_COUNTS = 3
+    MAX_PRECOMPILED_ENTRIES = 8192
+
+    def __init__(self, parts: list):
+        self.parts = parts
+        self.period = 1
+        for part in parts:
+            pattern = part.get("repeat_pattern")
+            if isinstance(pattern, list) and pattern:
+                self.period = math.lcm(self.period, len(pattern))
+        self.table = {}
+        self.warnings = self._analyze()
+        self.warnings_reported = False
+        self._compile()
+
+    def _pass_key(self, pass_count: int) -> int:
+        if pass_count < self.EXACT_PASS_COUNTS:
+            return pass_count
+        return self.EXACT_PASS_COUNTS + (pass_count - self.EXACT_PASS_COUNTS) % self.period
+
+    def _compile(self):
+        """Rellena la tabla completa si su tamaño es razonable; si no, se rellena bajo demanda."""
+        start_indices = range(-1, len(self.parts) + 1)
+        pass_keys = range(self.EXACT_PASS_COUNTS + self.period)
+        if len(start_indices) * 2 * (len(pass_keys) + 1) > self.MAX_PRECOMPILED_ENTRIES:
+            return
+        for start_index in start_indices:
+            for direction in ("+1", "-1"):
+                self._resolve(direction, start_index, 0, True)
+                for pass_key in pass_keys:
+                    self._resolve(direction, start_index, pass_key, False)
+
+    def _resolve(self, direction: str, start_index: int, pass_count: int, repeat_override: bool):
+        # En Song Mode el pass_count no influye: se usa una clave propia (no True, que colisionaría con 1)
+        key = (start_index, direction, "song_mode") if repeat_override else (start_index, direction, self._pass_key(pass_count))
+        if key not in self.table:
+            index, found_pass_count = _scan_next_valid_part_index(self.parts, direction, start_index, pass_count, repeat_override)
+            self.table[key] = None if index is None else (index, found_pass_count - pass_count)
+        return self.table[key]
+
+    def next_valid(self, direction: str, start_index: int, start_pass_count: int, repeat_override: bool):
+        """Equivalente a _scan_next_valid_part_index, resuelto con una consulta a la tabla."""
+        entry = self._resolve(direction, start_index, start_pass_count, repeat_override)
+        if entry is None:
+            return None, None
+        return entry[0], start_pass_count + entry[1]
+
+    def _cue_indices(self) -> dict:
+        """cue -> índice de la primera parte con ese cue (la que elige el runtime)."""
+        cue_to_index = {}
+        for i, part in enumerate(self.parts):
+            if part.get("cue") is not None:
+                cue_to_index.setdefault(part["cue"], i)
+        return cue_to_index
+
+    def _zero_bar_successors(self, index: int, cue_to_index: dict) -> set:
+        """
+        Partes a las que start_next_part puede pasar desde una parte sin compases, o
+        None si sale de ellas. A estas partes solo se llega con pass_count 0 (los saltos
+        lo reinician y los recorridos nunca se detienen en ellas) y pass_count no cambia
+        al repetirlas, así que siempre ejecutan el primer paso de su patrón. Los saltos
+        de un diccionario solo cuentan dentro de un patrón en lista (fuera de una lista,
+        el runtime lo trata como "next"). "next", "prev", first/last_part, booleanos y
+        el resto de acciones buscan una parte con compases o terminan la canción.
+        """
+        pattern = normalize_repeat_pattern(self.parts[index].get("repeat_pattern"))
+        if isinstance(pattern, list):
+            step = pattern[0] if pattern else "next"
+        else:
+            step = pattern if isinstance(pattern, str) else "next"
+
+        if isinstance(step, dict):
+            if "jump_to_part" in step:
+                target = step["jump_to_part"]
+                return {target} if 0 <= target < len(self.parts) else {None}
+            if "jump_to_cue" in step:
+                return {cue_to_index.get(step["jump_to_cue"])}
+            if "random_part" in step:
+                choices = step["random_part"] or [None]
+                return {t if t is not None and 0 <= t < len(self.parts) else None for t in choices}
+            return {None}
+        if step in ("repeat", "loop_part"):
+            return {index}
+        return {None}
+
+    def _analyze(self) -> list:
+        """
+        Detecta al cargar los bucles infinitos sobre partes sin compases. Una parte con 0
+        compases se salta (comportamiento documentado), así que solo se avisa cuando
+        ningún camino desde ella llega nunca a una parte con compases o al final.
+        """
+        warnings = []
+        zero_bar_parts = {i for i, part in enumerate(self.parts) if part.get("bars", 0) <= 0}
+        if not zero_bar_parts:
+            return warnings
+        if len(zero_bar_parts) == len(self.parts):
+            warnings.append("Ninguna parte tiene compases: la canción no puede sonar.")
+            return warnings
+
+        cue_to_index = self._cue_indices()
+        successors = {i: self._zero_bar_successors(i, cue_to_index) for i in zero_bar_parts}
+
+        # Partes atrapadas: todos sus destinos posibles son partes sin compases también atrapadas
+        trapped = set(zero_bar_parts)
+        changed = True
+        while changed:
+            changed = False
+            for i in list(trapped):
+                if not successors[i] <= trapped:
+                    trapped.discard(i)
+                    changed = True
+        if trapped:
+            names = ", ".join(str(i + 1) for i in sorted(trapped))
+            warnings.append(f"Bucle infinito entre partes sin compases: {names}")
+        return warnings
+
+
+# Grafos compilados por lista de partes, como LRU acotada (canción actual, canciones preparadas
+# por SongPrefetcher y las consultadas al predecir saltos). Cada grafo guarda una referencia a
+# su lista, así que el id() no se puede reutilizar mientras la entrada exista.
+MAX_TRANSITION_GRAPHS = 16
+_transition_graphs = collections.OrderedDict()
+_transition_graphs_lock = threading.Lock()
+
+def _get_transition_graph(parts: list) -> SongTransitionGraph:
+    """Devuelve (compilándolo si hace falta) el grafo de transiciones de una lista de partes."""
+    key = id(parts)
+    with _transition_graphs_lock:
+        graph = _transition_graphs.get(key)
+        if graph is not None and graph.parts is parts:
+            _transition_graphs.move_to_end(key)
+            return graph
+    graph = SongTransitionGraph(parts)
+    with _transition_graphs_lock:
+        _transition_graphs[key] = graph
+        _transition_graphs.move_to_end(key)
+        while len(_transition_graphs) > MAX_TRANSITION_GRAPHS:
+            _transition_graphs.popitem(last=False)
+    return graph
+
+def _find_next_valid_part_index(parts: list, direction: str, start_index: int, start_pass_count: int, repeat_override: bool):
+    """
+    Encuentra el índice y el pass_count de la siguiente parte válida.
+    Consulta el grafo de transiciones precompilado de la canción.
+    """
+    if not parts:
+        return None, None
+    return _get_transition_graph(parts).next_valid(direction, start_index, start_pass_count, repeat_override)
+
 def _get_parts_from_playlist_element(element):
     """
-    Devuelve la lista de partes de un elemento de la playlist, leyéndola del disco si es necesario.
+    Devuelve la lista de partes de un elemento de la playlist, leyéndola a través de
+    song_data_cache si el elemento hace referencia a un archivo.
     """
     # Prioridad 1: La canción está completamente incrustada en la playlist
     if "parts" in element and isinstance(element["parts"], list):
@@ -1070,9 +2199,8 @@ def _get_parts_from_playlist_element(element):
             # Usar la variable global SONGS_DIR que se actualiza al cargar un directorio
             song_path = SONGS_DIR / element["filepath"]
             if song_path.is_file():
-                with song_path.open('r', encoding='utf-8') as f:
-                    data = json5.load(f)
-                    return data.get("parts", [])
+                data = song_data_cache.load(song_path)
+                return data.get("parts", [])
         except Exception:
             # Si hay cualquier error de lectura, devolver una lista vacía
             return []
@@ -1161,18 +2289,8 @@ def resolve_global_part_index(global_index: int):
     if not playlist_state.is_active:
         return None, None
 
-    cumulative_parts = 0
-    for song_idx, element in enumerate(playlist_state.playlist_elements):
-        parts_in_song = _get_parts_from_playlist_element(element)
-        num_parts = len(parts_in_song)
-        
-        if global_index < cumulative_parts + num_parts:
-            local_part_index = global_index - cumulative_parts
-            return song_idx, local_part_index
-        
-        cumulative_parts += num_parts
-        
-    return None, None # Índice fuera de rango
+    # Búsqueda binaria sobre los offsets acumulados de GlobalPartsManager
+    return global_parts_manager.locate_global_index(global_index)
 
 
 def execute_global_part_jump():
@@ -1197,6 +2315,7 @@ def execute_global_part_jump():
 
         if clock_state.status == "PLAYING":
             process_song_tick()
+        send_song_position()
     
     pending_action = None
 
@@ -1278,6 +2397,7 @@ def execute_part_jump ():
         # Aplicar el estado y configurar la parte de destino
         song_state.pass_count = final_pass_count
         setup_part(final_index)
+        send_song_position()
     
     pending_action = None
   
@@ -1329,10 +2449,84 @@ def execute_song_jump():
             
         if clock_state.status == "PLAYING":
             process_song_tick()
+        send_song_position()
     else:
         set_feedback_message(f"Salto a canción {final_index + 1} inválido (error de carga).")
 
 
+SPP_TICKS_PER_STEP = 6  # Una unidad de Song Position Pointer es una semicorchea (6 ticks de clock)
+SPP_MAX_POSITION = 16383
+
+def song_position_pointer():
+    """Posición actual de la canción en unidades de SPP (semicorcheas desde el inicio), o None."""
+    part_index = song_state.current_part_index
+    if not (0 <= part_index < len(song_state.parts)):
+        return None
+    total_beats_in_part = song_state.parts[part_index].get("bars", 0) * song_state.time_signature_numerator
+    song_beat = song_state.part_beat_offsets[part_index] + total_beats_in_part - song_state.remaining_beats_in_part
+    return min(SPP_MAX_POSITION, song_beat * song_state.ticks_per_song_beat // SPP_TICKS_PER_STEP)
+
+def send_song_position():
+    """
+    Tras un salto, envía Song Position Pointer + Continue a los puertos de
+    config["clock"]["spp_out"]: los secuenciadores que lo soportan se recolocan
+    en la parte de destino con el siguiente tick de clock.
+    """
+    if clock_state.status != "PLAYING":
+        return
+    aliases = config.get("clock", {}).get("spp_out", [])
+    if isinstance(aliases, str):
+        aliases = [aliases]
+    position = song_position_pointer()
+    if not aliases or position is None:
+        return
+    messages = (mido.Message('songpos', pos=position), mido.Message('continue'))
+    for alias in aliases:
+        port = midi_outputs.get(alias)
+        if port is None:
+            continue
+        for message in messages:
+            output_dispatcher.send(alias, port, message, f"Error SPP ({alias})", priority=True)
+    _debug_log(f"SPP {position} enviado a {aliases}")
+
+def seek_song_position(position: int):
+    """Sigue un Song Position Pointer entrante (el maestro se ha recolocado)."""
+    seek_song_tick(position * SPP_TICKS_PER_STEP)
+
+def seek_song_tick(song_tick: int):
+    """
+    Coloca la canción en 'song_tick' (ticks de clock desde su inicio). Busca con
+    bisect en part_beat_offsets la parte que contiene la posición y ajusta parte,
+    beats restantes y contador de ticks. La línea de tiempo es el orden lineal de
+    partes de la canción actual, así que el pase vuelve a 0.
+    Con el transporte parado solo se mueve la posición: los triggers de la parte
+    quedan aparcados y se disparan una vez con el siguiente Continue (un Start
+    arranca desde el principio y ya los dispara).
+    """
+    global parked_part_change
+    offsets = song_state.part_beat_offsets
+    total_beats = offsets[-1]
+    if not song_state.parts or total_beats <= 0:
+        return
+    song_beat, tick_in_beat = divmod(song_tick, song_state.ticks_per_song_beat)
+    if song_beat >= total_beats:
+        song_beat, tick_in_beat = total_beats - 1, 0 # Más allá del final: último beat de la canción
+    # bisect_right salta las partes sin compases (offsets repetidos)
+    part_index = bisect.bisect_right(offsets, song_beat) - 1
+
+    with clock_tick_lock:
+        song_state.pass_count = 0
+        if part_index != song_state.current_part_index:
+            playing = clock_state.status == "PLAYING"
+            setup_part(part_index, fire_instant_trigger=playing)
+            if not playing:
+                parked_part_change = part_index
+        song_state.remaining_beats_in_part = offsets[part_index + 1] - song_beat
+        song_state.current_bar_in_part = (song_beat - offsets[part_index]) // song_state.time_signature_numerator
+        song_state.midi_clock_tick_counter = tick_in_beat
+    set_feedback_message(f"Posición: {song_state.parts[part_index].get('name', part_index + 1)}, compás {song_state.current_bar_in_part + 1}")
+
+
 def execute_pending_action():
     """Inspecciona la acción pendiente y decide si es un salto de parte o de canción."""
     if not pending_action:
@@ -1529,33 +2723,40 @@ def setup_part(part_index, fire_instant_trigger=True):
         previous_song_index = current_song_index
 
     if fire_instant_trigger:
-        global initial_outputs_sent, part_loop_active
-        # No enviar outputs si:
-        # 1. Ya se enviaron los iniciales para la primera parte, O
-        # 2. Está activo el loop de parte (para evitar reenvío en cada repetición)
-        skip_outputs = ((initial_outputs_sent and part_index == 0 and 
-                        playlist_state.current_song_index == 0) or
-                       part_loop_active)
-        
-        context = {
-            "song_index": playlist_state.current_song_index,
-            "song_name": song_state.song_name,
-            "song_color": song_state.song_color,
-            "part_index": part_index,
-            "part_name": part.get("name"),
-            "part_bars": part.get("bars"),
-            "part_color": part.get("color"),
-            "part_notes": part.get("notes"),
-            "part_cue": part.get("cue"),
-            "part_index_in_setlist": _get_global_part_index(playlist_state.current_song_index, part_index),
-            "skip_outputs": skip_outputs
-        }
-        fire_triggers("part_change", context, force_instant=True)
+        fire_part_change(part_index)
 
     # if song_state.remaining_beats_in_part <= 0:
     #     start_next_part()
 
 
+def fire_part_change(part_index):
+    """Dispara los triggers de 'part_change' (y los outputs de la parte) de 'part_index'."""
+    global parked_part_change
+    parked_part_change = None
+    part = song_state.parts[part_index]
+    # No enviar outputs si:
+    # 1. Ya se enviaron los iniciales para la primera parte, O
+    # 2. Está activo el loop de parte (para evitar reenvío en cada repetición)
+    skip_outputs = ((initial_outputs_sent and part_index == 0 and
+                    playlist_state.current_song_index == 0) or
+                   part_loop_active)
+    
+    context = {
+        "song_index": playlist_state.current_song_index,
+        "song_name": song_state.song_name,
+        "song_color": song_state.song_color,
+        "part_index": part_index,
+        "part_name": part.get("name"),
+        "part_bars": part.get("bars"),
+        "part_color": part.get("color"),
+        "part_notes": part.get("notes"),
+        "part_cue": part.get("cue"),
+        "part_index_in_setlist": _get_global_part_index(playlist_state.current_song_index, part_index),
+        "skip_outputs": skip_outputs
+    }
+    fire_triggers("part_change", context, force_instant=True)
+
+
 def _send_initial_outputs():
     """Envía los outputs de la primera parte para inicialización."""
     if not song_state.parts or not playlist_state.is_active or not outputs_enabled or silent_mode:
@@ -1563,13 +2764,9 @@ def _send_initial_outputs():
     
     # Obtener la primera parte de la primera canción
     first_part = song_state.parts[0]
-    local_actions = first_part.get("output", [])
-    
-    # Asegurar que sea una lista
-    if isinstance(local_actions, dict):
-        local_actions = [local_actions]
-    
-    if isinstance(local_actions, list) and local_actions:
+    local_actions = song_state.compiled_part_outputs[0] if song_state.compiled_part_outputs else []
+
+    if local_actions:
         context = {
             "song_index": 0,
             "song_name": song_state.song_name,
@@ -1584,11 +2781,17 @@ def _send_initial_outputs():
         }
         
         for action in local_actions:
-            _process_trigger_action(action, context)
-        
+            action.fire(context)
+
         set_feedback_message("Outputs iniciales enviados")
 
 
+def send_transport_message(message):
+    """Envía un mensaje de transporte a 'transport_out' por la cola prioritaria."""
+    port = midi_outputs.get("transport_out")
+    if port is not None:
+        output_dispatcher.send("transport_out", port, message, "Error transport_out", priority=True)
+
 def handle_start(is_passive_start=False):
     """Lógica para procesar un comando START."""
     global clock_state, initial_outputs_sent
@@ -1603,10 +2806,7 @@ def handle_start(is_passive_start=False):
     # Disparar el evento de inicio de transporte y el nuevo evento de inicio inicial
     if not is_passive_start:
         if "transport_out" in midi_outputs:
-            try:
-                midi_outputs["transport_out"].send(mido.Message('start'))
-            except Exception as e:
-                set_feedback_message(f"Error transport_out: {e}")
+            send_transport_message(mido.Message('start'))
         fire_triggers("playback_start", {})
         fire_triggers("playback_initial_start", {}) 
 
@@ -1627,6 +2827,8 @@ def handle_start(is_passive_start=False):
         }
         fire_triggers("song_change", context, force_instant=True)
 
+    internal_clock.start()
+
     # CORRECCIÓN: Eliminar la llamada inmediata a process_song_tick()
     # Esto causaba que el primer beat se perdiera porque decrementaba
     # remaining_beats_in_part antes de que el usuario viera el estado inicial
@@ -1640,13 +2842,11 @@ def handle_stop():
     
     # Resetear flag de outputs iniciales al parar
     initial_outputs_sent = False
+    internal_clock.stop()
 
     # Envío implícito de transporte si está configurado
     if "transport_out" in midi_outputs:
-        try:
-            midi_outputs["transport_out"].send(mido.Message('stop'))
-        except Exception as e:
-            set_feedback_message(f"Error transport_out: {e}")
+        send_transport_message(mido.Message('stop'))
     fire_triggers("playback_stop", {})
     if clock_state.status == "PLAYING":
         current_time = time.time()
@@ -1664,21 +2864,832 @@ def handle_continue():
 
     # Envío implícito de transporte si está configurado
     if "transport_out" in midi_outputs:
-        try:
-            midi_outputs["transport_out"].send(mido.Message('continue'))
-        except Exception as e:
-            set_feedback_message(f"Error transport_out: {e}")
+        send_transport_message(mido.Message('continue'))
     fire_triggers("playback_continue", {})
+    # Triggers de la parte a la que se movió un Song Position Pointer con el transporte parado
+    if parked_part_change is not None and parked_part_change == song_state.current_part_index:
+        fire_part_change(parked_part_change)
     clock_state.status = "PLAYING"
     current_time = time.time()
     clock_state.start_time = current_time
     if song_state.current_part_index != -1:
         song_state.start_time = current_time
+    internal_clock.start()
+
+def process_clock_message(msg, timestamp: float = None):
+    """
+    Procesa un mensaje del puerto de clock: transporte, ticks y, si el puerto es compartido, control.
+    'timestamp' es la hora de llegada (escala perf_counter); sin ella se usa el momento actual.
+    """
+    # --- Lógica de Clock ---
+
+    if msg.type in ('start', 'stop', 'continue'):
+        # Los esclavos reciben el transporte tal cual llega del maestro
+        if msg.type == 'start':
+            clock_forwarder.reset()
+        clock_forwarder.forward_transport(msg)
+
+    if msg.type == 'start':
+        handle_start()
+    elif msg.type == 'stop':
+        handle_stop()
+    elif msg.type == 'continue':
+        handle_continue()
+    elif msg.type == 'songpos':
+        seek_song_position(msg.pos)
+    elif msg.type == 'quarter_frame':
+        if mtc_engine.enabled:
+            mtc_engine.handle_quarter_frame(msg.frame_type, msg.frame_value,
+                                            time.perf_counter() if timestamp is None else timestamp)
+    elif msg.type == 'sysex' and mtc_engine.enabled and is_mtc_full_frame(msg):
+        mtc_engine.handle_full_frame(msg.data)
+    elif msg.type == 'clock':
+        if internal_clock.enabled or mtc_engine.enabled:
+            return # Con reloj interno o MTC, los ticks externos se ignoran
+        if clock_state.status == "STOPPED":
+            handle_start(is_passive_start=True)
+            set_feedback_message("Clock detectado. Iniciando secuencia...")
+        register_clock_tick(timestamp)
+
+    # --- Lógica de Control (si el puerto es compartido) ---
+    else:
+        control_port = midi_inputs.get("midi_in")
+        if control_port is not None and control_port is midi_inputs.get("clock"):
+            process_control_message(msg)
+
+def register_clock_tick(timestamp: float = None):
+    """Registra un tick de reloj (externo o del reloj interno) y avanza la canción."""
+    with clock_tick_lock:
+        # --- Cálculo de BPM (con la hora de llegada, no la de procesado) ---
+        now = time.perf_counter()
+        current_time = now if timestamp is None else timestamp
+        clock_state.register_input_latency(now - current_time)
+        clock_state.real_ticks += 1
+        # Si el flywheel ha rellenado un hueco, el tick real se reconcilia con los sintetizados
+        ticks_to_advance, valid_interval = clock_flywheel.reconcile(current_time)
+        if valid_interval and clock_state.last_tick_time > 0:
+            delta = current_time - clock_state.last_tick_time
+            if delta > 0:
+                clock_state.register_tick_interval(delta)
+        clock_state.last_tick_time = current_time
+
+        # --- Avance de la Canción ---
+        for _ in range(ticks_to_advance):
+            advance_song_clock(current_time, arrival=timestamp)
+
+def advance_song_clock(tick_time: float, arrival: float = None):
+    """
+    Avanza un tick de reloj la canción (real, sintetizado por el flywheel o recuperado
+    tras un hueco). Los esclavos de clock.forward reciben exactamente los mismos ticks,
+    antes de que la canción avance y se encolen triggers. 'arrival' es la llegada del
+    tick real (None en los sintetizados).
+    """
+    clock_forwarder.forward_tick(arrival)
+    if clock_state.status == "PLAYING":
+        song_state.midi_clock_tick_counter += 1
+        if song_state.midi_clock_tick_counter >= song_state.ticks_per_song_beat:
+            song_state.midi_clock_tick_counter = 0
+            process_song_tick(tick_time)
+
+
+class ClockFlywheel:
+    """
+    Mantiene la secuencia en fase durante cortes breves del reloj maestro.
+    Con tempo estable, predice cada tick a partir del último tick real y el intervalo
+    medio; si pasa el plazo (más un margen) sin tick real, sintetiza uno, hasta
+    'max_ticks' seguidos. Cuando vuelven los ticks reales se reconcilia:
+      - si el hueco supera 'max_ticks', no se recupera nada: se resincroniza y se
+        vuelve a medir el tempo;
+      - si el maestro va por delante de lo sintetizado, se avanzan los ticks que falten;
+      - si vamos por delante, se absorben ticks reales hasta recuperar la fase;
+      - los ticks que llegan en ráfaga (entregados con retraso) se absorben también,
+        como mucho tantos como se sintetizaron.
+    """
+    GRACE = 0.5  # Margen, en intervalos, antes de dar un tick por perdido
+
+    def __init__(self):
+        self.enabled = False
+        self.max_ticks = MIDI_PPQN
+        self.thread = None
+        self.reset()
+
+    def reset(self):
+        self.synthesized_run = 0  # Ticks sintetizados desde el último tick real
+        self.debt = 0             # Ticks reales que hay que absorber (íbamos por delante)
+        self.burst_budget = 0     # Ticks en ráfaga que aún se pueden absorber
+
+    def configure(self, settings: dict):
+        self.enabled = bool(settings.get("enabled", False))
+        self.max_ticks = max(1, int(settings.get("max_ticks", MIDI_PPQN)))
+
+    def start(self):
+        if self.enabled and self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="clock-flywheel", daemon=True)
+            self.thread.start()
+
+    def _interval(self):
+        """Intervalo esperado entre ticks, o None si el tempo no es fiable."""
+        if (internal_clock.enabled or mtc_engine.enabled or clock_state.status != "PLAYING" or
+                not clock_state.tempo_stable or clock_state.last_tick_time <= 0):
+            return None
+        return clock_state.tick_stats.mean or None
+
+    def reconcile(self, tick_time: float):
+        """
+        Llamado (con clock_tick_lock) por cada tick real. Devuelve (ticks_a_avanzar,
+        intervalo_válido): cuántos ticks debe avanzar la canción y si el intervalo
+        respecto al tick real anterior sirve para estimar el tempo.
+        """
+        if not (self.synthesized_run or self.debt or self.burst_budget):
+            return 1, True
+
+        interval = clock_state.tick_stats.mean
+        since_last = tick_time - clock_state.last_tick_time if clock_state.last_tick_time > 0 else 0.0
+
+        if self.synthesized_run:
+            # Primer tick real tras un hueco: ¿qué posición ocupa respecto al último real?
+            synthesized = self.synthesized_run
+            self.synthesized_run = 0
+            elapsed = max(1, round(since_last / interval)) if interval else 1
+            if elapsed > self.max_ticks:
+                # Hueco más largo de lo que cubre el flywheel: no se rellena, se resincroniza
+                # (el clock sigue desde aquí y el tempo se vuelve a medir)
+                _debug_log(f"Flywheel: hueco de {elapsed} ticks (máx. {self.max_ticks}), resincronizando")
+                clock_state.reset_tempo()
+                return 1, False
+            missing = elapsed - synthesized
+            self.burst_budget = synthesized
+            if missing >= 1:
+                clock_state.caught_up_ticks += missing - 1
+                return missing, False
+            self.debt = -missing
+            clock_state.swallowed_ticks += 1
+            return 0, False
+
+        if self.debt:
+            self.debt -= 1
+            clock_state.swallowed_ticks += 1
+            return 0, False
+
+        if interval and since_last < interval * self.GRACE:
+            # Tick en ráfaga: era uno de los que ya cubrimos sintetizando
+            self.burst_budget -= 1
+            clock_state.swallowed_ticks += 1
+            return 0, False
+
+        self.burst_budget = 0
+        return 1, True
+
+    def step(self) -> float:
+        """Sintetiza un tick si el siguiente ya se da por perdido; devuelve cuánto esperar."""
+        wait = 0.005
+        with clock_tick_lock:
+            interval = self._interval()
+            if interval and self.synthesized_run < self.max_ticks:
+                predicted = clock_state.last_tick_time + (self.synthesized_run + 1) * interval
+                now = time.perf_counter()
+                deadline = predicted + interval * self.GRACE
+                if now >= deadline:
+                    self.synthesized_run += 1
+                    clock_state.synthesized_ticks += 1
+                    advance_song_clock(predicted)
+                    wait = 0
+                else:
+                    wait = min(deadline - now, wait)
+        return wait
+
+    def _run(self):
+        while not SHUTDOWN_FLAG:
+            wait = self.step()
+            if wait > 0:
+                time.sleep(wait)
+
+clock_flywheel = ClockFlywheel()
+
+
+MIDI_CLOCK_MESSAGE = mido.Message('clock')
+
+class InternalClock:
+    """
+    Reloj maestro interno a 24 PPQN para montajes sin clock externo.
+    Cada tick tiene un plazo absoluto (ancla + n * intervalo), así que el error de un
+    tick no se arrastra a los siguientes: el hilo duerme hasta poco antes del plazo y
+    apura el resto con una espera activa corta. Los ticks entran por register_clock_tick,
+    igual que los externos, de modo que BPM, jitter y estabilidad de ClockState miden
+    la precisión del propio planificador. La precisión por debajo del milisegundo es
+    la mejor posible, no garantizada: depende del planificador del sistema operativo.
+    """
+    MIN_BPM = 20.0
+    MAX_BPM = 300.0
+    SPIN_WINDOW = 0.0015        # Último tramo antes del plazo en espera activa (cediendo el GIL)
+    SWITCH_INTERVAL = 0.0005    # Intervalo de cambio de hilo del GIL mientras suena (por defecto 5 ms)
+    MAX_CATCH_UP = MIDI_PPQN    # Con más de un beat de retraso se reancla en vez de recuperar
+
+    def __init__(self):
+        self.enabled = False
+        self.send_clock = False   # Enviar también MIDI clock por 'transport_out'
+        self.running = False
+        self.thread = None
+        self.bpm = 120.0
+        self._interval = 60.0 / (self.bpm * MIDI_PPQN)
+        self._anchor = 0.0
+        self._tick_index = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._saved_switch_interval = None
+        self.late_ticks = 0          # Ticks emitidos más de 1 ms tarde
+        self.max_lateness_ms = 0.0
+
+    def configure(self, settings: dict, bpm: float = None):
+        """Activa el reloj interno si config["clock"]["source"] es 'internal' o se pasa un tempo (--bpm)."""
+        self.enabled = settings.get("source") == "internal" or bpm is not None
+        self.send_clock = bool(settings.get("send_clock", False))
+        self.set_tempo(bpm if bpm is not None else settings.get("internal_bpm", 120))
+        if self.enabled and self.thread is None:
+            clock_state.source_name = "Interno"
+            self.thread = threading.Thread(target=self._run, name="internal-clock", daemon=True)
+            self.thread.start()
+
+    def set_tempo(self, bpm: float) -> float:
+        """Cambia el tempo; el cambio se aplica a partir del próximo tick, sin saltos de fase."""
+        bpm = min(self.MAX_BPM, max(self.MIN_BPM, float(bpm)))
+        with self._lock:
+            if self.running:
+                self._anchor += self._tick_index * self._interval
+                self._tick_index = 0
+            self.bpm = bpm
+            self._interval = 60.0 / (bpm * MIDI_PPQN)
+        return bpm
+
+    def start(self):
+        if not self.enabled or self.running:
+            return
+        with self._lock:
+            self._anchor = time.perf_counter()
+            self._tick_index = 0
+            self.running = True
+            if self._saved_switch_interval is None:
+                self._saved_switch_interval = sys.getswitchinterval()
+                sys.setswitchinterval(self.SWITCH_INTERVAL)
+        self._wakeup.set()
+
+    def stop(self):
+        with self._lock:
+            self.running = False
+            if self._saved_switch_interval is not None:
+                sys.setswitchinterval(self._saved_switch_interval)
+                self._saved_switch_interval = None
+
+    def _run(self):
+        while not SHUTDOWN_FLAG:
+            if not self.running:
+                self._wakeup.wait(0.1)
+                self._wakeup.clear()
+                continue
+
+            with self._lock:
+                deadline = self._anchor + self._tick_index * self._interval
+            remaining = deadline - time.perf_counter()
+            if remaining > self.SPIN_WINDOW:
+                time.sleep(remaining - self.SPIN_WINDOW)
+                continue # Recalcular: el tempo o el transporte pueden haber cambiado
+            while self.running and time.perf_counter() < deadline:
+                time.sleep(0)
+            if not self.running:
+                continue
+
+            tick_time = time.perf_counter()
+            lateness = tick_time - deadline
+            with self._lock:
+                self._tick_index += 1
+                if lateness > self.MAX_CATCH_UP * self._interval:
+                    self._anchor = tick_time
+                    self._tick_index = 1
+            if lateness > 0.001:
+                self.late_ticks += 1
+            if lateness * 1000 > self.max_lateness_ms:
+                self.max_lateness_ms = lateness * 1000
+
+            if self.send_clock:
+                send_transport_message(MIDI_CLOCK_MESSAGE)
+            register_clock_tick(tick_time)
+
+internal_clock = InternalClock()
+
+def nudge_internal_tempo(delta: float):
+    """Sube o baja el tempo del reloj interno (TUI)."""
+    if not internal_clock.enabled:
+        set_feedback_message("Tempo solo ajustable con reloj interno.")
+        return
+    bpm = internal_clock.set_tempo(internal_clock.bpm + delta)
+    set_feedback_message(f"Tempo interno: {bpm:.0f} BPM")
+
+
+class ClockForwardTarget:
+    """Puerto esclavo de 'clock.forward' con su divisor, multiplicador y contadores."""
+    __slots__ = ("alias", "port", "enabled", "divider", "multiplier", "counter",
+                 "forwarded", "latency_total", "latency_max", "direct_sends")
+
+    def __init__(self, alias: str, port, settings: dict):
+        self.alias = alias
+        self.port = port
+        self.enabled = bool(settings.get("enabled", True))
+        self.divider = max(1, int(settings.get("divider", 1)))
+        self.multiplier = max(1, int(settings.get("multiplier", 1)))
+        self.counter = 0          # Ticks de entrada desde el último Start (para el divisor)
+        self.forwarded = 0        # Ticks enviados (incluidos los del multiplicador)
+        self.latency_total = 0.0  # Llegada del tick -> enviado, solo ticks directos
+        self.latency_max = 0.0
+        self.direct_sends = 0
+
+    def send_tick(self) -> bool:
+        try:
+            self.port.send(MIDI_CLOCK_MESSAGE)
+            self.forwarded += 1
+            return True
+        except Exception as e:
+            set_feedback_message(f"Error clock forward ({self.alias}): {e}")
+            return False
+
+
+class ClockForwarder:
+    """
+    Reenvía el clock de entrada (o el del reloj interno) a varios puertos esclavos,
+    configurados en config["clock"]["forward"]. Recibe los ticks que avanza la canción
+    (advance_song_clock), incluidos los del flywheel y los recuperados al reconciliar.
+    El tick se envía directamente desde el hilo que lo procesa, antes de avanzar la
+    canción, así que sale por delante de cualquier trigger del mismo tick y sin pasar
+    por las colas del OutputDispatcher (mido serializa los envíos concurrentes a un
+    mismo puerto).
+    Con 'divider' N se reenvía uno de cada N ticks; con 'multiplier' M, los M-1 ticks
+    extra se reparten en el intervalo medido, desde un hilo con plazos absolutos.
+    """
+    def __init__(self):
+        self.targets = {}       # alias -> ClockForwardTarget
+        self.subticks = []      # heap de (plazo, secuencia, ClockForwardTarget)
+        self._sequence = 0
+        self._condition = threading.Condition()
+        self.thread = None
+
+    def configure(self, settings):
+        """Acepta una lista de alias o un diccionario {alias: {enabled, divider, multiplier}}."""
+        if isinstance(settings, list):
+            settings = {alias: {} for alias in settings}
+        targets = {}
+        for alias, options in (settings or {}).items():
+            port = midi_outputs.get(alias)
+            if port is None:
+                print(f"[!] clock.forward: no hay salida MIDI con alias '{alias}'.")
+                continue
+            targets[alias] = ClockForwardTarget(alias, port, options if isinstance(options, dict) else {})
+        self.targets = targets
+        if any(target.multiplier > 1 for target in targets.values()) and self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="clock-forward", daemon=True)
+            self.thread.start()
+
+    def reset(self):
+        """Al arrancar el transporte: reinicia la fase de los divisores y descarta ticks pendientes."""
+        with self._condition:
+            self.subticks.clear()
+            for target in self.targets.values():
+                target.counter = 0
+
+    def forward_tick(self, arrival: float = None):
+        """Reenvía un tick a cada puerto activo. 'arrival' es la hora de llegada (perf_counter)."""
+        if not self.targets:
+            return
+        now = time.perf_counter()
+        arrival = now if arrival is None else arrival
+        interval = clock_state.tick_stats.mean
+        # Con send_clock, 'transport_out' ya recibe el clock del reloj interno (como en forward_transport)
+        transport_port = midi_outputs.get("transport_out") if internal_clock.enabled and internal_clock.send_clock else None
+        with self._condition:
+            # Los ticks del multiplicador que sigan pendientes se envían ya: el recuento debe ser exacto
+            while self.subticks:
+                heapq.heappop(self.subticks)[2].send_tick()
+            for target in self.targets.values():
+                if not target.enabled or (transport_port is not None and target.port is transport_port):
+                    continue
+                send_now = target.counter % target.divider == 0
+                target.counter += 1
+                if not send_now:
+                    continue
+                if target.send_tick():
+                    latency = time.perf_counter() - arrival
+                    target.direct_sends += 1
+                    target.latency_total += latency
+                    if latency > target.latency_max:
+                        target.latency_max = latency
+                if target.multiplier > 1:
+                    self._schedule_subticks(target, now, interval * target.divider / target.multiplier)
+            if self.subticks:
+                self._condition.notify()
+
+    def _schedule_subticks(self, target, start: float, spacing: float):
+        for n in range(1, target.multiplier):
+            if spacing <= 0:
+                target.send_tick() # Sin tempo medido todavía: se envían seguidos
+                continue
+            self._sequence += 1
+            heapq.heappush(self.subticks, (start + n * spacing, self._sequence, target))
+
+    def forward_transport(self, message):
+        """Reenvía Start/Stop/Continue a los esclavos ('transport_out' ya lo recibe de handle_*)."""
+        for alias, target in self.targets.items():
+            if target.enabled and alias != "transport_out":
+                try:
+                    target.port.send(message)
+                except Exception as e:
+                    set_feedback_message(f"Error clock forward ({alias}): {e}")
+
+    def _run(self):
+        with self._condition:
+            while not SHUTDOWN_FLAG:
+                if not self.subticks:
+                    self._condition.wait(0.1)
+                    continue
+                remaining = self.subticks[0][0] - time.perf_counter()
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                    continue
+                heapq.heappop(self.subticks)[2].send_tick()
+
+    def stats(self) -> dict:
+        """Por puerto: ticks reenviados y latencia añadida (llegada -> enviado) media y máxima."""
+        return {
+            alias: {
+                "forwarded": target.forwarded,
+                "avg_latency_ms": (target.latency_total / target.direct_sends * 1000) if target.direct_sends else 0.0,
+                "max_latency_ms": target.latency_max * 1000,
+            }
+            for alias, target in self.targets.items()
+        }
+
+clock_forwarder = ClockForwarder()
+
+
+MTC_FRAME_RATES = (24.0, 25.0, 30000 / 1001, 30.0)  # Código de tasa del MTC -> frames por segundo
+
+def mtc_timecode_seconds(hours: int, minutes: int, seconds: int, frames: int, rate_code: int) -> float:
+    """Convierte un timecode MTC a segundos (29.97 con drop-frame incluido)."""
+    if rate_code == 2:
+        total_minutes = 60 * hours + minutes
+        frame_number = (3600 * hours + 60 * minutes + seconds) * 30 + frames
+        frame_number -= 2 * (total_minutes - total_minutes // 10)
+        return frame_number / MTC_FRAME_RATES[2]
+    return 3600 * hours + 60 * minutes + seconds + frames / MTC_FRAME_RATES[rate_code]
+
+def parse_timecode(text: str):
+    """'HH:MM:SS:FF' -> (horas, minutos, segundos, frames)."""
+    parts = [int(value) for value in str(text).replace(";", ":").split(":")]
+    if len(parts) != 4:
+        raise ValueError(f"Timecode inválido: '{text}'")
+    return tuple(parts)
+
+def is_mtc_full_frame(msg) -> bool:
+    """Full-frame MTC: F0 7F <dispositivo> 01 01 hh mm ss ff F7."""
+    data = msg.data
+    return len(data) >= 8 and data[0] == 0x7F and data[2] == 0x01 and data[3] == 0x01
+
+
+class MTCEngine:
+    """
+    Motor de sincronía por MIDI Time Code (config["clock"]["source"] = "mtc") sobre el
+    puerto de clock. Decodifica quarter-frames y full-frames en una posición de alta
+    resolución (avanza un cuarto de frame por quarter-frame y se corrige con cada
+    timecode completo) y la convierte con el tempo de la canción en ticks de 24 PPQN,
+    que entran por register_clock_tick como los del clock. Cada tick lleva la hora
+    interpolada a la que le tocaba llegar, así el BPM no hereda la granularidad de los
+    quarter-frames. Se engancha tras LOCK_CYCLES timecodes coherentes; sin
+    quarter-frames durante TIMEOUT_FRAMES el maestro se da por parado.
+    Los locates se cuentan desde el inicio de la canción actual: el offset para la
+    primera, y para las siguientes el timecode en que empezaron (se reancla en cada
+    cambio de canción). Un locate anterior a ese inicio cae al principio de la canción.
+    """
+    LOCK_CYCLES = 2
+    TIMEOUT_FRAMES = 8
+    MAX_DRIFT_FRAMES = 1.0   # Diferencia mayor entre posición prevista y timecode: locate
+
+    def __init__(self):
+        self.enabled = False
+        self.bpm = 120.0                  # Tempo si la canción no define 'bpm'
+        self.offset = (0, 0, 0, 0)        # Timecode del inicio de la canción
+        self.thread = None
+        self.lock_state = "UNLOCKED"      # UNLOCKED, LOCKING o LOCKED
+        self.rate_code = 1
+        self.position = None              # Segundos de timecode (resolución de cuarto de frame)
+        self.timecode = "--:--:--:--"
+        self.qf_stats = TickIntervalStats(size=32, recent_size=8)
+        self.qf_jitter_ms = 0.0
+        self.drift_ms = 0.0               # Última corrección al completar un timecode
+        self.relocations = 0
+        self.sequence_errors = 0
+        self._pieces = [0] * 8
+        self._next_piece = 0
+        self._good_cycles = 0
+        self._last_qf_time = 0.0
+        self._song_tick = None            # Último tick de canción emitido (None: hay que colocar)
+        self._tick_anchor = 0.0
+        self._position_anchor = 0.0
+        self._anchor_bpm = 120.0
+        self._song_start = None           # Timecode (s) del inicio de la canción actual (None: el offset)
+        self._song_index = None           # Canción de la playlist a la que corresponde _song_start
+
+    def configure(self, settings: dict):
+        mtc_settings = settings.get("mtc", {})
+        self.enabled = settings.get("source") == "mtc" and not internal_clock.enabled
+        self.bpm = float(mtc_settings.get("bpm", 120))
+        try:
+            self.offset = parse_timecode(mtc_settings.get("offset", "00:00:00:00"))
+        except ValueError as e:
+            print(f"[!] clock.mtc.offset: {e}")
+        if self.enabled and self.thread is None:
+            clock_state.source_name = "MTC"
+            self.thread = threading.Thread(target=self._run, name="mtc-monitor", daemon=True)
+            self.thread.start()
+
+    @property
+    def frame_duration(self) -> float:
+        return 1.0 / MTC_FRAME_RATES[self.rate_code]
+
+    def tempo(self) -> float:
+        return float(song_state.bpm or self.bpm)
+
+    def handle_quarter_frame(self, piece: int, value: int, arrival: float):
+        with clock_tick_lock:
+            if piece != self._next_piece:
+                # Fuera de secuencia: entrada a mitad de ciclo, retroceso o quarter-frames perdidos
+                if self.lock_state != "UNLOCKED":
+                    self.sequence_errors += 1
+                    self.lock_state = "LOCKING"
+                self._good_cycles = 0
+                self._last_qf_time = arrival
+                if piece != 0:
+                    self._next_piece = 0
+                    return
+            elif self._last_qf_time > 0:
+                self.qf_stats.add(arrival - self._last_qf_time)
+                self.qf_jitter_ms = self.qf_stats.std_dev * 1000
+            self._last_qf_time = arrival
+            self._pieces[piece] = value & 0x0F
+            self._next_piece = (piece + 1) % 8
+            if self.position is not None:
+                self.position += self.frame_duration / 4
+            if piece == 7:
+                self._complete_timecode()
+            if self.lock_state == "LOCKED":
+                self._advance(arrival)
+
+    def _complete_timecode(self):
+        pieces = self._pieces
+        frames = pieces[0] | (pieces[1] & 0x1) << 4
+        seconds = pieces[2] | (pieces[3] & 0x3) << 4
+        minutes = pieces[4] | (pieces[5] & 0x3) << 4
+        hours = pieces[6] | (pieces[7] & 0x1) << 4
+        self.rate_code = (pieces[7] >> 1) & 0x3
+        self.timecode = f"{hours:02d}:{minutes:02d}:{seconds:02d}:{frames:02d}"
+        # El timecode es el del quarter-frame 0; el 7 llega 7/4 de frame más tarde
+        measured = mtc_timecode_seconds(hours, minutes, seconds, frames, self.rate_code) + 1.75 * self.frame_duration
+        if self.position is not None and self.lock_state == "LOCKED":
+            drift = measured - self.position
+            self.drift_ms = drift * 1000
+            if abs(drift) > self.MAX_DRIFT_FRAMES * self.frame_duration:
+                self.relocations += 1
+                self._song_tick = None
+        self.position = measured
+        self._good_cycles += 1
+        self.lock_state = "LOCKED" if self._good_cycles >= self.LOCK_CYCLES else "LOCKING"
+        clock_state.source_name = f"MTC {self.timecode}" if self.lock_state == "LOCKED" else "MTC ~"
+
+    def handle_full_frame(self, data):
+        """Full-frame (locate del maestro): nueva posición; se recoloca al volver a engancharse."""
+        hours_byte, minutes, seconds, frames = data[4:8]
+        with clock_tick_lock:
+            self.rate_code = (hours_byte >> 5) & 0x3
+            hours = hours_byte & 0x1F
+            self.timecode = f"{hours:02d}:{minutes:02d}:{seconds:02d}:{frames:02d}"
+            self.position = mtc_timecode_seconds(hours, minutes, seconds, frames, self.rate_code)
+            self.relocations += 1
+            self._song_tick = None
+            self._good_cycles = 0
+            self._next_piece = 0
+            if self.lock_state == "LOCKED":
+                self.lock_state = "LOCKING"
+            clock_state.source_name = f"MTC {self.timecode}"
+
+    def _track_song_start(self, position: float):
+        """Si ha cambiado la canción de la playlist, su inicio pasa a ser el timecode 'position'."""
+        song_index = playlist_state.current_song_index if playlist_state.is_active else None
+        if self._song_start is None:
+            self._song_start = mtc_timecode_seconds(*self.offset, self.rate_code)
+            self._song_index = song_index
+        elif song_index != self._song_index:
+            self._song_start = position
+            self._song_index = song_index
+
+    def _tick_position(self, tick: int, ticks_per_second: float) -> float:
+        """Timecode (s) que corresponde a un tick emitido, según el ancla actual."""
+        return self._position_anchor + (tick - self._tick_anchor) / ticks_per_second
+
+    def _advance(self, arrival: float):
+        """Emite los ticks de canción que la posición MTC ya ha alcanzado."""
+        if clock_state.status != "PLAYING":
+            handle_start(is_passive_start=True) # Igual que el primer clock: outputs iniciales y arranque
+            self._song_tick = None
+            return
+
+        bpm = self.tempo()
+        ticks_per_second = bpm * MIDI_PPQN / 60
+        if self._song_tick is None:
+            # (Re)colocar: el tiempo desde el inicio de la canción actual es la posición dentro de ella
+            self._track_song_start(self.position)
+            song_seconds = max(0.0, self.position - self._song_start)
+            self._tick_anchor = song_seconds * ticks_per_second
+            self._position_anchor = self.position
+            self._anchor_bpm = bpm
+            self._song_tick = int(self._tick_anchor)
+            seek_song_tick(self._song_tick)
+            return
+        if bpm != self._anchor_bpm:
+            # Cambio de tempo (otra canción): reanclar para que la posición musical no salte
+            self._tick_anchor += (self.position - self._position_anchor) * self._anchor_bpm * MIDI_PPQN / 60
+            self._position_anchor = self.position
+            self._anchor_bpm = bpm
+        self._track_song_start(self._tick_position(self._song_tick, ticks_per_second)) # Cambio manual de canción
+
+        exact_tick = self._tick_anchor + (self.position - self._position_anchor) * ticks_per_second
+        target = int(exact_tick)
+        if target - self._song_tick > MIDI_PPQN:
+            self._song_tick = None # Más de un beat de golpe: recolocar en vez de recorrer ticks
+            return self._advance(arrival)
+        while self._song_tick < target:
+            self._song_tick += 1
+            register_clock_tick(arrival - (exact_tick - self._song_tick) / ticks_per_second)
+            # Si este tick ha terminado la canción, la siguiente empieza en él
+            self._track_song_start(self._tick_position(self._song_tick, ticks_per_second))
+
+    def _run(self):
+        """Vigila la llegada de quarter-frames: si se interrumpe, el maestro se ha parado."""
+        while not SHUTDOWN_FLAG:
+            time.sleep(0.05)
+            with clock_tick_lock:
+                if self.lock_state == "UNLOCKED":
+                    continue
+                if time.perf_counter() - self._last_qf_time > self.TIMEOUT_FRAMES * self.frame_duration:
+                    self.lock_state = "UNLOCKED"
+                    self._good_cycles = 0
+                    self._next_piece = 0
+                    self._song_tick = None
+                    clock_state.source_name = "MTC"
+                    if clock_state.status == "PLAYING":
+                        handle_stop()
+
+    def stats(self) -> dict:
+        return {
+            "lock_state": self.lock_state,
+            "timecode": self.timecode,
+            "fps": MTC_FRAME_RATES[self.rate_code],
+            "qf_jitter_ms": self.qf_jitter_ms,
+            "drift_ms": self.drift_ms,
+            "relocations": self.relocations,
+            "sequence_errors": self.sequence_errors,
+        }
+
+mtc_engine = MTCEngine()
+
+
+class ClockSource:
+    """Entrada de clock candidata y su estado de salud."""
+    __slots__ = ("name", "port", "rank", "last_tick", "run", "ticks")
+
+    def __init__(self, name: str, port, rank: int):
+        self.name = name
+        self.port = port
+        self.rank = rank
+        self.last_tick = 0.0  # Llegada del último tick (perf_counter)
+        self.run = 0          # Ticks seguidos a ritmo de clock
+        self.ticks = 0
+
+
+class ClockSourceSupervisor:
+    """
+    Escucha una lista ordenada de entradas de clock ('devices.midi_in.clock' como lista)
+    y decide cuál alimenta la secuencia; los mensajes del resto solo cuentan para su
+    salud. Una fuente está sana si lleva HEALTHY_TICKS ticks seguidos y el último llegó
+    hace menos de TIMEOUT_TICKS intervalos. Cuando la activa se calla ese tiempo (un
+    cuarto de beat), el primer tick de otra fuente sana provoca el cambio a la mejor
+    clasificada, de modo que la conmutación se completa dentro del beat. Los ticks
+    perdidos durante el hueco se recuperan con el tempo estimado para no perder la fase.
+    """
+    TIMEOUT_TICKS = 6
+    HEALTHY_TICKS = 6
+    DEFAULT_INTERVAL = 60.0 / (120 * MIDI_PPQN)
+
+    def __init__(self):
+        self.sources = []     # ClockSource en orden de preferencia
+        self.active = None
+        self.switchovers = 0
+        self.history = collections.deque(maxlen=20)  # (hora, desde, hacia, hueco_ms)
+        self._lock = threading.Lock()
+
+    def add_source(self, name: str, port):
+        source = ClockSource(name, port, len(self.sources))
+        self.sources.append(source)
+        if self.active is None:
+            self.active = source
+
+    def disable(self):
+        """Cierra las fuentes en espera (la activa la gestiona quien llama)."""
+        sources, self.sources, active, self.active = self.sources, [], self.active, None
+        for source in sources:
+            if source is not active:
+                try:
+                    source.port.close()
+                except Exception:
+                    pass
+
+    def close(self):
+        """Cierra los puertos de todas las fuentes, incluida la activa (al salir)."""
+        sources, self.sources, self.active = self.sources, [], None
+        for source in sources:
+            try:
+                if not source.port.closed:
+                    source.port.close()
+            except Exception:
+                pass
+
+    def handler_for(self, source):
+        """Manejador con hora de llegada para attach_input_handler."""
+        def handle(msg, timestamp):
+            self.route(source, msg, timestamp)
+        return handle
+
+    def _timeout(self) -> float:
+        return self.TIMEOUT_TICKS * (clock_state.tick_stats.mean or self.DEFAULT_INTERVAL)
+
+    def _is_healthy(self, source, now: float) -> bool:
+        return source.run >= self.HEALTHY_TICKS and now - source.last_tick < self._timeout()
+
+    def route(self, source, msg, timestamp: float = None):
+        """Actualiza la salud de la fuente y, si es la activa, procesa el mensaje."""
+        if msg.type == 'clock':
+            now = time.perf_counter() if timestamp is None else timestamp
+            with self._lock:
+                if source.last_tick and now - source.last_tick < self._timeout():
+                    source.run += 1
+                else:
+                    source.run = 1
+                source.last_tick = now
+                source.ticks += 1
+                active = self.active
+                if (source is not active and self._is_healthy(source, now) and
+                        (active is None or not self._is_healthy(active, now))):
+                    self._switch_to(self._best_source(now), now)
+        if source is self.active:
+            process_clock_message(msg, timestamp)
+
+    def _best_source(self, now: float):
+        return next(source for source in self.sources if self._is_healthy(source, now))
+
+    def _switch_to(self, source, now: float):
+        previous = self.active
+        gap_ms = (now - previous.last_tick) * 1000 if previous and previous.last_tick else 0.0
+        self.active = source
+        self.switchovers += 1
+        self.history.append((time.time(), previous.name if previous else None, source.name, gap_ms))
+        midi_inputs["clock"] = source.port
+        clock_state.source_name = source.name
+        self._catch_up(now)
+        message = f"Clock: '{previous.name if previous else '-'}' sin señal, cambiando a '{source.name}'"
+        set_feedback_message(message)
+        _debug_log(f"{message} (hueco {gap_ms:.1f} ms)")
+
+    def _catch_up(self, tick_time: float):
+        """Avanza los ticks que faltaron entre el último tick de la fuente anterior y el primero de la nueva."""
+        with clock_tick_lock:
+            interval = clock_state.tick_stats.mean
+            if clock_flywheel.synthesized_run or not interval or clock_state.last_tick_time <= 0:
+                return # El flywheel ya cubrió el hueco (lo reconcilia register_clock_tick) o no hay tempo
+            missed = min(MIDI_PPQN, max(0, round((tick_time - clock_state.last_tick_time) / interval) - 1))
+            for n in range(1, missed + 1):
+                advance_song_clock(clock_state.last_tick_time + n * interval)
+            clock_state.caught_up_ticks += missed
+            clock_state.last_tick_time = 0 # El hueco no es un intervalo de tempo válido
+
+    def stats(self) -> dict:
+        now = time.perf_counter()
+        return {
+            "active": self.active.name if self.active else None,
+            "switchovers": self.switchovers,
+            "sources": {source.name: {"healthy": self._is_healthy(source, now), "ticks": source.ticks}
+                        for source in self.sources},
+        }
+
+clock_supervisor = ClockSourceSupervisor()
+
 
 def midi_input_listener():
-    """El hilo principal que escucha los mensajes MIDI y actualiza el estado."""
-    global clock_state, song_state
-    
+    """Hilo de sondeo del puerto de clock (modo de ingesta 'poll')."""
     # Obtener los puertos del diccionario
     main_port = midi_inputs.get("clock")
     if main_port:
@@ -1686,10 +3697,19 @@ def midi_input_listener():
         while main_port.poll() is not None: pass
 
     while not SHUTDOWN_FLAG:
+        if clock_supervisor.sources:
+            # Varias fuentes candidatas: se sondean todas y el supervisor reparte
+            received = False
+            for source in clock_supervisor.sources:
+                for msg in source.port.iter_pending():
+                    clock_supervisor.route(source, msg)
+                    received = True
+            if not received:
+                time.sleep(0.001)
+            continue
+
         # CORRECCIÓN BUG-001: Leer el puerto dentro del bucle para detectar cambios
         main_port = midi_inputs.get("clock")
-        control_port = midi_inputs.get("midi_in")
-        is_shared_port = control_port is not None and control_port is main_port
 
         if not main_port:
             time.sleep(0.1)
@@ -1705,41 +3725,151 @@ def midi_input_listener():
             time.sleep(0.001)
             continue
 
-        # --- Lógica de Clock ---
+        process_clock_message(msg)
 
-        if msg.type == 'start':
-            handle_start()
-        elif msg.type == 'stop':
-            handle_stop()
-        elif msg.type == 'continue':
-            handle_continue()
-        elif msg.type == 'clock':
-            if clock_state.status == "STOPPED":
-                handle_start(is_passive_start=True)
-                set_feedback_message("Clock detectado. Iniciando secuencia...")
-            # --- Cálculo de BPM ---
-            current_time = time.perf_counter()
-            if clock_state.last_tick_time > 0:
-                delta = current_time - clock_state.last_tick_time
-                if delta > 0:
-                    clock_state.tick_times.append(delta)
-                    if len(clock_state.tick_times) > 96:
-                        clock_state.tick_times.pop(0)
-                    avg_delta = sum(clock_state.tick_times) / len(clock_state.tick_times)
-                    clock_state.bpm = (60.0 / MIDI_PPQN) / avg_delta
-            clock_state.last_tick_time = current_time
-
-            # --- Avance de la Canción ---
-            if clock_state.status == "PLAYING":
-                song_state.midi_clock_tick_counter += 1
-                if song_state.midi_clock_tick_counter >= song_state.ticks_per_song_beat:
-                    song_state.midi_clock_tick_counter = 0
-                    process_song_tick()
-        
-        # --- Lógica de Control (si el puerto es compartido) ---
-        elif is_shared_port:
-            process_control_message(msg)
 
+def clock_ingestion_mode() -> str:
+    """
+    Modo de lectura de los puertos de entrada, según config["clock"]["ingestion"]:
+    'poll' (por defecto) usa los hilos de sondeo con sleep(0.001); 'callback' entrega
+    cada mensaje en cuanto llega (ver bench_ingestion.py).
+    """
+    mode = config.get("clock", {}).get("ingestion", "poll")
+    return "callback" if mode == "callback" else "poll"
+
+class DriverTimestamper:
+    """
+    Reconstruye en la escala de time.perf_counter() el instante de llegada de cada
+    mensaje a partir del delta que entrega el driver (rtmidi: segundos desde el mensaje
+    anterior). Se reancla a perf_counter si el resultado queda en el futuro o se
+    retrasa más de MAX_LAG (silencios largos, deriva entre relojes).
+    """
+    MAX_LAG = 0.05
+
+    def __init__(self):
+        self.last_timestamp = None
+
+    def stamp(self, delta: float) -> float:
+        now = time.perf_counter()
+        if self.last_timestamp is None:
+            timestamp = now
+        else:
+            timestamp = self.last_timestamp + delta
+            if timestamp > now or now - timestamp > self.MAX_LAG:
+                timestamp = now
+        self.last_timestamp = timestamp
+        return timestamp
+
+def _attach_rtmidi_timestamped_callback(port, dispatch) -> bool:
+    """
+    Con el backend rtmidi de mido, registra el callback directamente en rtmidi para
+    conservar el delta de llegada que el envoltorio de mido descarta.
+    Usa atributos privados de mido.backends.rtmidi.Input (_rt, _callback_lock, _queue;
+    probado con mido 1.3.x): si falta alguno devuelve False sin tocar el puerto y el
+    llamador usa el callback estándar de mido.
+    """
+    rt_port = getattr(port, "_rt", None)
+    callback_lock = getattr(port, "_callback_lock", None)
+    pending = getattr(port, "_queue", None)
+    if not (callable(getattr(rt_port, "set_callback", None))
+            and callable(getattr(rt_port, "cancel_callback", None))
+            and hasattr(callback_lock, "__enter__")
+            and callable(getattr(pending, "iterpoll", None))):
+        return False
+    stamper = DriverTimestamper()
+
+    def on_rtmidi_message(msg_data, data):
+        raw_bytes, delta = msg_data
+        timestamp = stamper.stamp(delta)
+        try:
+            msg = mido.Message.from_bytes(raw_bytes)
+        except ValueError:
+            return # Ignorar mensajes inválidos (igual que mido)
+        dispatch(msg, timestamp)
+
+    with callback_lock:
+        rt_port.cancel_callback()
+        # Entregar lo que mido ya tuviera en cola antes de cambiar de callback
+        for msg in pending.iterpoll():
+            dispatch(msg)
+        rt_port.set_callback(on_rtmidi_message)
+    return True
+
+def _guarded_input_handler(handler, timestamped: bool = False):
+    """
+    Envuelve un manejador para que una excepción no mate el hilo del backend MIDI.
+    Si 'timestamped', el manejador recibe también el instante de llegada (perf_counter
+    en el momento de la entrega cuando el backend no aporta uno).
+    """
+    def dispatch(msg, timestamp=None):
+        try:
+            if timestamped:
+                handler(msg, time.perf_counter() if timestamp is None else timestamp)
+            else:
+                handler(msg)
+        except Exception as e:
+            _debug_log(f"Error procesando {msg}: {traceback.format_exc()}")
+            set_feedback_message(f"[!] Error procesando MIDI: {e}")
+    return dispatch
+
+def _blocking_receive_loop(port, is_live, handler):
+    """Alternativa a los callbacks: receive() bloqueante mientras is_live() sea cierto."""
+    while not SHUTDOWN_FLAG and is_live():
+        try:
+            msg = port.receive()
+        except Exception:
+            return # Puerto cerrado o reconfigurado
+        if msg is not None:
+            handler(msg)
+
+def attach_input_handler(port, role: str, handler, discard_pending: bool = False, timestamped: bool = False,
+                         is_live=None):
+    """
+    Conecta 'handler' al puerto sin sondeo: con el callback del backend (rtmidi lo
+    invoca desde su propio hilo) o, si el backend no tiene callbacks, con un hilo
+    de receive() bloqueante. Con 'timestamped', handler(msg, timestamp) recibe la
+    hora de llegada del driver cuando el backend la proporciona.
+    'is_live' indica al hilo bloqueante si el puerto sigue en uso; por defecto, mientras
+    midi_inputs[role] sea este puerto.
+    """
+    if is_live is None:
+        is_live = lambda: midi_inputs.get(role) is port
+    if discard_pending:
+        while port.poll() is not None: pass
+    handler = _guarded_input_handler(handler, timestamped)
+    if timestamped:
+        try:
+            if _attach_rtmidi_timestamped_callback(port, handler):
+                return None
+            _debug_log(f"Timestamps del driver no disponibles en '{role}' ({type(port).__name__}): "
+                       f"se usa el callback estándar")
+        except Exception as e:
+            _debug_log(f"Timestamps del driver no disponibles en '{role}': {e}; se usa el callback estándar")
+    if isinstance(getattr(type(port), "callback", None), property):
+        try:
+            port.callback = handler
+            return None
+        except Exception as e:
+            _debug_log(f"Callback no disponible en '{role}': {e}")
+    thread = threading.Thread(target=_blocking_receive_loop, args=(port, is_live, handler), daemon=True)
+    thread.start()
+    return thread
+
+def start_event_ingestion():
+    """Arranca la ingesta por eventos de los puertos de clock y de control."""
+    clock_port = midi_inputs.get("clock")
+    if clock_supervisor.sources:
+        time.sleep(0.05)
+        for source in clock_supervisor.sources:
+            attach_input_handler(source.port, f"clock ({source.name})", clock_supervisor.handler_for(source),
+                                 discard_pending=True, timestamped=True,
+                                 is_live=lambda source=source: source in clock_supervisor.sources)
+    elif clock_port:
+        time.sleep(0.05)
+        attach_input_handler(clock_port, "clock", process_clock_message, discard_pending=True, timestamped=True)
+    control_port = midi_inputs.get("midi_in")
+    if control_port and control_port is not clock_port:
+        attach_input_handler(control_port, "midi_in", process_control_message)
 
 
 def trigger_song_jump(action_dict):
@@ -1793,21 +3923,8 @@ def trigger_cue_jump(cue_num: int):
         set_feedback_message(f"Cues ignorados (no hay playlist activa).")
         return
 
-    # --- LÓGICA DE BÚSQUEDA GLOBAL ---
-    target_song_idx = None
-    target_part_idx = None
-    part_name = "N/A"
-
-    for s_idx, element in enumerate(playlist_state.playlist_elements):
-        parts = _get_parts_from_playlist_element(element)
-        for p_idx, part in enumerate(parts):
-            if part.get("cue") == cue_num:
-                target_song_idx = s_idx
-                target_part_idx = p_idx
-                part_name = part.get("name", "N/A")
-                break # Salir del bucle de partes
-        if target_song_idx is not None:
-            break # Salir del bucle de canciones
+    # --- BÚSQUEDA GLOBAL (índice de cues construido al cargar el setlist) ---
+    target_song_idx, target_part_idx, part_name = global_parts_manager.lookup_cue(cue_num)
     
     if target_song_idx is None:
         set_feedback_message(f"Cue {cue_num} no encontrado en la playlist.")
@@ -1999,13 +4116,9 @@ def _get_global_part_index(target_song_idx, local_part_idx):
     if not playlist_state.is_active:
         return local_part_idx
 
-    cumulative_parts = 0
-    for i in range(target_song_idx):
-        element = playlist_state.playlist_elements[i]
-        parts_in_song = _get_parts_from_playlist_element(element)
-        cumulative_parts += len(parts_in_song)
-
-    return cumulative_parts + local_part_idx
+    # Consulta O(1) a los offsets acumulados por canción
+    offset_index = global_parts_manager.global_index_of(target_song_idx, local_part_idx)
+    return offset_index if offset_index is not None else local_part_idx
 
 
 def midi_control_listener():
@@ -2051,9 +4164,9 @@ def handle_song_end():
                 reset_song_state_on_stop()
                 set_feedback_message("Error al cargar la siguiente canción. Reproducción detenida.")
         else:
-            total_parts = 0
-            for element in playlist_state.playlist_elements:
-                total_parts += len(_get_parts_from_playlist_element(element))
+            if not global_parts_manager.is_initialized:
+                global_parts_manager.build_global_parts_list()
+            total_parts = global_parts_manager.song_part_offsets[-1]
             
             context = {
                 "playlist_name": playlist_state.playlist_name,
@@ -2123,9 +4236,9 @@ def load_file_by_name(filename: str):
         set_feedback_message(f"Error: no se encontró el archivo '{filename}'")
         return
 
-    # Validar antes de cargar
-    is_valid, errors, data = MIDItemaValidator.validate_file(filepath)
-    if not is_valid:
+    # Validar antes de cargar (la caché en disco evita repetirlo si el archivo no ha cambiado)
+    data, errors = song_data_cache.load_validated(filepath)
+    if data is None or errors:
         error_details = "\n".join(str(e) for e in errors[:5])
         set_feedback_message(f"[!] Archivo inválido: {errors[0]}")
         print(f"[!] Errores de validación en '{filename}':\n{error_details}")
@@ -2133,13 +4246,19 @@ def load_file_by_name(filename: str):
     # Resetear estado antes de cargar
     reset_song_state_on_stop()
     playlist_state = PlaylistState()
+    # Un setlist nuevo no comparte canciones con el anterior: liberar las cachés
+    song_data_cache.purge()
+    song_prefetcher.clear()
+    _transition_graphs.clear()
 
 
     if "songs" in data and isinstance(data["songs"], list):
         playlist_state.is_active = True
         playlist_state.playlist_name = data.get("playlist_name", filepath.stem)
-        playlist_state.triggers = data.get("triggers", {}) 
+        playlist_state.triggers = data.get("triggers", {})
+        compile_playlist_triggers()
         playlist_state.playlist_elements = data["songs"]
+        global_parts_manager.build_global_parts_list()
         set_feedback_message(f"Playlist '{playlist_state.playlist_name}' cargada.")
         
         playlist_mode = data.get("mode", "loop")
@@ -2148,7 +4267,7 @@ def load_file_by_name(filename: str):
         load_song_from_playlist(0)
     else:
         playlist_state.is_active = False
-        load_song_file(data=data)
+        load_song_file(data=data, errors=errors)
     
     loaded_filename = filepath.stem
 
@@ -2160,6 +4279,9 @@ def reconfigure_clock_port(port_name: str):
     if clock_state.status != "STOPPED":
         handle_stop()
 
+    # La elección manual sustituye a la lista de fuentes candidatas
+    clock_supervisor.disable()
+
     if "clock" in midi_inputs and midi_inputs["clock"]:
         try:
             midi_inputs["clock"].close()
@@ -2169,6 +4291,8 @@ def reconfigure_clock_port(port_name: str):
     try:
         midi_inputs["clock"] = mido.open_input(port_name)
         clock_state.source_name = port_name
+        if clock_ingestion_mode() == "callback":
+            attach_input_handler(midi_inputs["clock"], "clock", process_clock_message, discard_pending=True, timestamped=True)
         set_feedback_message(f"Clock reconfigurado a: '{port_name}'")
     except Exception as e:
         set_feedback_message(f"Error abriendo '{port_name}': {e}")
@@ -2182,6 +4306,7 @@ def main():
 
     init_debug_log()
     initial_data = None
+    initial_errors = None
     initial_load_success = True
     print("MIDItema\n")
     # El help text ahora es más genérico para reflejar la carga de directorios y playlists
@@ -2191,6 +4316,7 @@ def main():
     parser.add_argument("--conf", type=str, default=None, help="Especifica un archivo de configuración alternativo.")
     parser.add_argument("--debug", action="store_true", help="Activa logging de debug y modo consola de depuración.")
     parser.add_argument("--no-output", action="store_true", help="Inicia con el envío de outputs desactivado.")
+    parser.add_argument("--bpm", type=float, default=None, help="Usa el reloj interno (sin clock externo) a este tempo.")
     mode_group = parser.add_mutually_exclusive_group()
     mode_group.add_argument("--song-mode", action="store_true", help="Inicia en 'Song Mode', ignorando los patrones de repetición.")
     mode_group.add_argument("--loop-mode", action="store_true", help="Inicia en 'Loop Mode', respetando los patrones de repetición.")
@@ -2219,6 +4345,9 @@ def main():
     # Añadimos la ruta al propio diccionario de configuración. Es más robusto.
     config['_source_file'] = config_file_to_load
     setup_devices(config)
+    output_dispatcher.start()
+    clock_forwarder.configure(config.get("clock", {}).get("forward", {}))
+    compile_config_triggers()
 
 
     if args.song_file:
@@ -2250,13 +4379,11 @@ def main():
                 # Si no se encuentra, activamos la lógica del selector interactivo
                 args.song_file = None
             else:
-                try:
-                    with selected_file_path.open('r', encoding='utf-8') as f:
-                        initial_data = json5.load(f)
-                    loaded_filename = selected_file_path.stem
-                except Exception as e:
-                    print(f"Error al leer el archivo '{selected_file_path.name}': {e}")
+                initial_data, initial_errors = song_data_cache.load_validated(selected_file_path)
+                if initial_data is None:
+                    print(f"Error al leer el archivo '{selected_file_path.name}': {initial_errors[0].message}")
                     return
+                loaded_filename = selected_file_path.stem
 
     if initial_data:
         # Procesar devices del archivo si existen
@@ -2301,19 +4428,27 @@ def main():
                 print("[*] La TUI se abrirá de todos modos. Puedes cargar otro archivo desde el menú.")
                 initial_load_success = False
         else:
-            if not load_song_file(data=initial_data):
+            if not load_song_file(data=initial_data, errors=initial_errors):
                 print("[!] Error: No se pudo cargar la canción.")
                 print("[*] La TUI se abrirá de todos modos. Puedes cargar otro archivo desde el menú.")
                 initial_load_success = False
             if args.song_mode: repeat_override_active = True
             elif args.loop_mode: repeat_override_active = False
 
-    listener_thread = threading.Thread(target=midi_input_listener, daemon=True)
-    listener_thread.start()
+    listener_thread = None
     control_listener_thread = None
-    if "midi_in" in midi_inputs and midi_inputs["midi_in"] is not midi_inputs.get("clock"):
-        control_listener_thread = threading.Thread(target=midi_control_listener, daemon=True)
-        control_listener_thread.start()
+    if clock_ingestion_mode() == "poll":
+        listener_thread = threading.Thread(target=midi_input_listener, daemon=True)
+        listener_thread.start()
+        if "midi_in" in midi_inputs and midi_inputs["midi_in"] is not midi_inputs.get("clock"):
+            control_listener_thread = threading.Thread(target=midi_control_listener, daemon=True)
+            control_listener_thread.start()
+    else:
+        start_event_ingestion()
+    clock_flywheel.configure(config.get("clock", {}).get("flywheel", {}))
+    clock_flywheel.start()
+    internal_clock.configure(config.get("clock", {}), bpm=args.bpm)
+    mtc_engine.configure(config.get("clock", {}))
 
     signal.signal(signal.SIGINT, signal_handler)
    
@@ -2335,8 +4470,26 @@ def main():
             if pending_action:
                 action_str = str(pending_action.get('target', 'N/A'))
 
+            output_stats = output_dispatcher.stats().values()
+            queued = sum(stats["depth"] for stats in output_stats)
+            dropped = sum(stats["dropped"] for stats in output_stats)
+            max_latency = max((stats["max_latency_ms"] for stats in output_stats), default=0.0)
+
+            tempo_str = "" if clock_state.tempo_stable else "~"
+            forward_stats = clock_forwarder.stats().values()
+            forward_str = ""
+            if forward_stats:
+                forward_max = max(stats["max_latency_ms"] for stats in forward_stats)
+                forward_str = f" | Fwd: max {forward_max:.2f}ms"
+            if clock_supervisor.sources:
+                forward_str += f" | Src: {clock_state.source_name} ({clock_supervisor.switchovers} sw)"
+            if mtc_engine.enabled:
+                forward_str += (f" | MTC {mtc_engine.lock_state} {mtc_engine.timecode} "
+                                f"(jitter {mtc_engine.qf_jitter_ms:.2f}ms, drift {mtc_engine.drift_ms:.2f}ms)")
             print(
-                f"Status: {status} | BPM: {bpm:.1f} | Part: {part_name} ({part_idx+1}) | Pending: {action_str}      ",
+                f"Status: {status} | BPM: {tempo_str}{bpm:.1f} (jitter {clock_state.jitter_ms:.2f}ms) | Part: {part_name} ({part_idx+1}) | Pending: {action_str} | "
+                f"Out: {queued} queued, {dropped} dropped, max {max_latency:.1f}ms | "
+                f"Ticks: {clock_state.real_ticks} real, {clock_state.synthesized_ticks} synth{forward_str}      ",
                 end='\r'
             )
             sys.stdout.flush()
@@ -2362,13 +4515,16 @@ def main():
 
     SHUTDOWN_FLAG = True
     print("\nCerrando...")
+    output_dispatcher.stop()
+    internal_clock.stop()
+    clock_supervisor.close()
     unique_ports = {id(p): p for p in midi_inputs.values()}.values()
     for port in unique_ports:
         if port and not port.closed: port.close()
     for port in midi_outputs.values():
         if port and not port.closed: port.close()
 
-    if listener_thread.is_alive(): listener_thread.join(timeout=0.2)
+    if listener_thread and listener_thread.is_alive(): listener_thread.join(timeout=0.2)
     if control_listener_thread and control_listener_thread.is_alive(): control_listener_thread.join(timeout=0.2)
     print("Detenido.")
 
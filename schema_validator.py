@@ -1,7 +1,9 @@
 import jsonschema
 from jsonschema import Draft7Validator, validators
 from pathlib import Path
-import json5
+import json
+import json_loader
+import hashlib
 from typing import Dict, List, Tuple, Optional
 
 class ValidationError:
@@ -178,6 +180,12 @@ class MIDItemaValidator:
                 "enum": ["1/4", "1/8", "1/16"],
                 "description": "División de tiempo para el contador"
             },
+            "bpm": {
+                "type": "number",
+                "minimum": 20,
+                "maximum": 300,
+                "description": "Tempo de la canción (sincronía por MTC)"
+            },
             "devices": {
                 "type": "object",
                 "description": "Definición local de dispositivos (override)"
@@ -243,27 +251,48 @@ class MIDItemaValidator:
         }
     }
     
+    # Validadores compilados una sola vez por proceso (ver _get_validator)
+    _default_validator_class = None
+    _validators = {}  # es_playlist -> validador
+
     @staticmethod
-    def _create_validator_with_defaults(schema):
-        """Crea un validador que aplica valores por defecto."""
-        def extend_with_default(validator_class):
-            validate_properties = validator_class.VALIDATORS["properties"]
-            
-            def set_defaults(validator, properties, instance, schema):
-                for property, subschema in properties.items():
-                    if "default" in subschema:
-                        instance.setdefault(property, subschema["default"])
-                
-                for error in validate_properties(validator, properties, instance, schema):
-                    yield error
+    def _extend_with_default(validator_class):
+        """Crea una clase de validador que, además de validar, aplica los valores por defecto."""
+        validate_properties = validator_class.VALIDATORS["properties"]
+        
+        def set_defaults(validator, properties, instance, schema):
+            for property, subschema in properties.items():
+                if "default" in subschema:
+                    instance.setdefault(property, subschema["default"])
             
-            return validators.create(
-                validator_class.META_SCHEMA,
-                {**validator_class.VALIDATORS, "properties": set_defaults}
-            )
+            for error in validate_properties(validator, properties, instance, schema):
+                yield error
         
-        DefaultValidator = extend_with_default(Draft7Validator)
-        return DefaultValidator(schema)
+        return validators.create(
+            validator_class.META_SCHEMA,
+            {**validator_class.VALIDATORS, "properties": set_defaults}
+        )
+
+    @classmethod
+    def _create_validator_with_defaults(cls, schema):
+        """Crea un validador que aplica valores por defecto."""
+        # La clase no depende del schema: se crea la primera vez y se reutiliza
+        if cls._default_validator_class is None:
+            cls._default_validator_class = cls._extend_with_default(Draft7Validator)
+        return cls._default_validator_class(schema)
+
+    @classmethod
+    def _get_validator(cls, is_playlist: bool):
+        """
+        Devuelve el validador de playlist o de canción, creándolo solo la primera vez.
+        Los validadores de jsonschema no guardan estado entre validaciones, así que el
+        mismo objeto sirve para todas las llamadas, también desde varios hilos.
+        """
+        validator = cls._validators.get(is_playlist)
+        if validator is None:
+            validator = cls._create_validator_with_defaults(cls.PLAYLIST_SCHEMA if is_playlist else cls.SONG_SCHEMA)
+            cls._validators[is_playlist] = validator
+        return validator
     
     @staticmethod
     def estimate_line_number(json_str: str, path: List[str]) -> Optional[int]:
@@ -288,9 +317,7 @@ class MIDItemaValidator:
         
         # Determinar si es playlist o canción
         is_playlist = "songs" in data and isinstance(data["songs"], list)
-        schema = cls.PLAYLIST_SCHEMA if is_playlist else cls.SONG_SCHEMA
-        
-        validator = cls._create_validator_with_defaults(schema)
+        validator = cls._get_validator(is_playlist)
         
         for error in validator.iter_errors(data):
             # Construir el path legible
@@ -387,6 +414,15 @@ class MIDItemaValidator:
         # pero requiere contexto del sistema de archivos que esta clase pura no tiene.
         return errors
     
+    @classmethod
+    def schema_fingerprint(cls) -> str:
+        """
+        Huella (sha256) de los schemas de canción y playlist. Cambia con cualquier
+        modificación de los schemas, p. ej. un valor por defecto nuevo.
+        """
+        schemas = json.dumps([cls.SONG_SCHEMA, cls.PLAYLIST_SCHEMA], sort_keys=True, default=str)
+        return hashlib.sha256(schemas.encode('utf-8')).hexdigest()
+
     @classmethod
     def validate_file(cls, filepath: Path) -> Tuple[bool, List[ValidationError], Optional[dict]]:
         """
@@ -395,18 +431,30 @@ class MIDItemaValidator:
         try:
             with filepath.open('r', encoding='utf-8') as f:
                 content = f.read()
-                data = json5.loads(content)
-            
-            errors = cls.validate_data(data, content)
-            return len(errors) == 0, errors, data
-            
-        except json5.JSONDecodeError as e:
+        except Exception as e:
+            error = ValidationError(f"Error al leer archivo: {str(e)}", [])
+            return False, [error], None
+        data, errors = cls.validate_content(content)
+        return data is not None and len(errors) == 0, errors, data
+
+    @classmethod
+    def validate_content(cls, content: str) -> Tuple[Optional[dict], List[ValidationError]]:
+        """
+        Parsea y valida el texto de un archivo; retorna (datos_parseados, errores).
+        Con un error de sintaxis, datos_parseados es None.
+        """
+        try:
+            data = json_loader.loads(content)
+        except json_loader.JSONLoadError as e:
             error = ValidationError(
                 f"Error de sintaxis JSON: {str(e)}",
                 [],
-                e.lineno if hasattr(e, 'lineno') else None
+                e.lineno
             )
-            return False, [error], None
+            return None, [error]
+
+        try:
+            return data, cls.validate_data(data, content)
         except Exception as e:
             error = ValidationError(f"Error al leer archivo: {str(e)}", [])
-            return False, [error], None
\ No newline at end of file
+            return None, [error]
\ No newline at end of file
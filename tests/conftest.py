@@ -0,0 +1,22 @@
+"""Configuración común de los tests: ruta del proyecto y puertos MIDI/OSC falsos."""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+class FakePort:
+    """Puerto de salida (MIDI u OSC) que guarda lo enviado."""
+    def __init__(self):
+        self.sent = []
+
+    def send(self, msg):
+        self.sent.append(msg)
+
+
+@pytest.fixture
+def make_port():
+    """Crea puertos falsos: make_port() -> FakePort con la lista 'sent'."""
+    return FakePort
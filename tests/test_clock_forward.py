@@ -0,0 +1,53 @@
+"""Tests del reenvío de clock a los esclavos (ClockForwarder)."""
+import time
+
+import miditema
+
+
+def test_slaves_receive_the_ticks_the_song_advances(monkeypatch, make_port):
+    slave = make_port()
+    monkeypatch.setattr(miditema, "midi_outputs", {"slave": slave})
+    monkeypatch.setattr(miditema, "clock_state", miditema.ClockState())
+    monkeypatch.setattr(miditema, "clock_flywheel", miditema.ClockFlywheel())
+    monkeypatch.setattr(miditema, "clock_forwarder", miditema.ClockForwarder())
+    miditema.clock_forwarder.configure(["slave"])
+    miditema.clock_flywheel.enabled = True
+    miditema.clock_state.status = "PLAYING"
+    advanced = []
+    monkeypatch.setattr(miditema, "process_song_tick", lambda tick_time=None: None)
+    monkeypatch.setattr(miditema.song_state, "ticks_per_song_beat", miditema.MIDI_PPQN)
+    real_advance = miditema.advance_song_clock
+    monkeypatch.setattr(miditema, "advance_song_clock",
+                        lambda tick_time, arrival=None: (advanced.append(tick_time), real_advance(tick_time, arrival)))
+
+    interval = 60.0 / (120 * miditema.MIDI_PPQN)
+    base = time.perf_counter() - 100 * interval
+    for n in range(72):
+        miditema.register_clock_tick(base + n * interval)
+    assert miditema.clock_state.tempo_stable
+
+    # El maestro calla: el flywheel sintetiza 5 ticks...
+    for _ in range(5):
+        assert miditema.clock_flywheel.step() == 0
+    # ...y vuelve 8 ticks después del último real: faltan 3 que se recuperan de golpe
+    miditema.register_clock_tick(base + 79 * interval)
+
+    assert len(advanced) == 72 + 8
+    assert len(slave.sent) == len(advanced)
+
+
+def test_transport_out_is_not_forwarded_when_internal_clock_sends_clock(monkeypatch, make_port):
+    transport, slave = make_port(), make_port()
+    monkeypatch.setattr(miditema, "midi_outputs", {"transport_out": transport, "slave": slave})
+    monkeypatch.setattr(miditema, "clock_state", miditema.ClockState())
+    monkeypatch.setattr(miditema, "clock_forwarder", miditema.ClockForwarder())
+    monkeypatch.setattr(miditema, "internal_clock", miditema.InternalClock())
+    miditema.clock_forwarder.configure(["transport_out", "slave"])
+
+    miditema.register_clock_tick()
+    assert (len(transport.sent), len(slave.sent)) == (1, 1)
+
+    miditema.internal_clock.enabled = True
+    miditema.internal_clock.send_clock = True
+    miditema.register_clock_tick()
+    assert (len(transport.sent), len(slave.sent)) == (1, 2)
@@ -0,0 +1,100 @@
+"""Tests de la ingesta de las fuentes de clock candidatas (ClockSourceSupervisor)."""
+import queue
+import threading
+
+import mido
+import miditema
+
+
+class BlockingInputPort:
+    """Puerto de entrada sin callbacks: obliga a usar el hilo de receive() bloqueante."""
+    def __init__(self):
+        self.messages = queue.Queue()
+        self.closed = False
+
+    def poll(self):
+        return None
+
+    def receive(self):
+        msg = self.messages.get()
+        if msg is None:
+            raise OSError("puerto cerrado")
+        return msg
+
+    def close(self):
+        self.closed = True
+        self.messages.put(None)
+
+
+def test_standby_source_keeps_receiving_and_close_releases_ports(monkeypatch):
+    supervisor = miditema.ClockSourceSupervisor()
+    monkeypatch.setattr(miditema, "clock_supervisor", supervisor)
+    monkeypatch.setattr(miditema, "midi_inputs", {})
+    primary, standby = BlockingInputPort(), BlockingInputPort()
+    supervisor.add_source("primary", primary)
+    supervisor.add_source("standby", standby)
+    miditema.midi_inputs["clock"] = primary
+
+    standby_routed = threading.Event()
+
+    def route(source, msg, timestamp=None):
+        if source.name == "standby":
+            standby_routed.set()
+
+    monkeypatch.setattr(supervisor, "route", route)
+    miditema.start_event_ingestion()
+
+    # El hilo bloqueante de la fuente en espera sigue vivo y entrega sus mensajes
+    standby.messages.put(mido.Message("clock"))
+    assert standby_routed.wait(1.0)
+
+    supervisor.close()
+    assert primary.closed and standby.closed
+    assert supervisor.sources == []
+
+
+class CallbackInputPort:
+    """Puerto con la propiedad 'callback' de mido pero sin los internos de su backend rtmidi."""
+    def __init__(self, rt=None):
+        self.callback_value = None
+        self.closed = False
+        if rt is not None:
+            self._rt = rt  # Sin _callback_lock ni _queue: versión de mido distinta
+
+    @property
+    def callback(self):
+        return self.callback_value
+
+    @callback.setter
+    def callback(self, function):
+        self.callback_value = function
+
+    def poll(self):
+        return None
+
+
+class RecordingRtPort:
+    def __init__(self):
+        self.calls = []
+
+    def set_callback(self, function):
+        self.calls.append("set_callback")
+
+    def cancel_callback(self):
+        self.calls.append("cancel_callback")
+
+
+def test_timestamped_handler_falls_back_to_standard_callback(monkeypatch):
+    logged = []
+    monkeypatch.setattr(miditema, "_debug_log", logged.append)
+    for rt in (None, RecordingRtPort()):
+        port = CallbackInputPort(rt)
+        received = []
+        assert miditema.attach_input_handler(port, "clock", lambda msg, ts: received.append(msg),
+                                             timestamped=True) is None
+        # Los internos incompletos no se tocan y se usa el callback estándar
+        if rt is not None:
+            assert rt.calls == []
+        port.callback(mido.Message("clock"))
+        assert received == [mido.Message("clock")]
+    assert len(logged) == 2 and all("callback estándar" in line for line in logged)
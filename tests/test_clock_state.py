@@ -0,0 +1,16 @@
+"""Tests del estimador de tempo de ClockState."""
+import random
+
+import miditema
+
+
+def test_tempo_stays_stable_with_usb_jitter():
+    rng = random.Random(1)
+    state = miditema.ClockState()
+    interval = 60.0 / (120 * miditema.MIDI_PPQN)
+    stable = []
+    for _ in range(20 * miditema.MIDI_PPQN):
+        state.register_tick_interval(interval + rng.gauss(0, 0.001))  # ~1 ms de jitter
+        stable.append(state.tempo_stable)
+    assert all(stable[miditema.ClockState.STABLE_MIN_TICKS:])
+    assert abs(state.bpm - 120) < 1
@@ -0,0 +1,30 @@
+"""Tests de la reconciliación del flywheel tras un corte del reloj maestro."""
+import time
+
+import miditema
+
+
+def test_long_gap_resyncs_instead_of_backfilling(monkeypatch):
+    monkeypatch.setattr(miditema, "clock_state", miditema.ClockState())
+    monkeypatch.setattr(miditema, "clock_flywheel", miditema.ClockFlywheel())
+    monkeypatch.setattr(miditema, "clock_forwarder", miditema.ClockForwarder())
+    miditema.clock_flywheel.enabled = True
+    miditema.clock_state.status = "PLAYING"
+    advanced = []
+    monkeypatch.setattr(miditema, "advance_song_clock",
+                        lambda tick_time, arrival=None: advanced.append(tick_time))
+
+    interval = 60.0 / (120 * miditema.MIDI_PPQN)
+    base = time.perf_counter() - 30.0 - 100 * interval
+    for n in range(72):
+        miditema.register_clock_tick(base + n * interval)
+    max_ticks = miditema.clock_flywheel.max_ticks
+    while miditema.clock_flywheel.step() == 0:
+        pass
+    assert len(advanced) == 72 + max_ticks
+
+    # El maestro vuelve 30 s después: solo avanza el tick que llega
+    miditema.register_clock_tick(time.perf_counter())
+    assert len(advanced) == 72 + max_ticks + 1
+    assert miditema.clock_state.caught_up_ticks == 0
+    assert not miditema.clock_state.tempo_stable
@@ -0,0 +1,18 @@
+"""Tests del reloj interno (InternalClock)."""
+import sys
+
+import miditema
+
+
+def test_switch_interval_is_restored_on_stop():
+    original = sys.getswitchinterval()
+    clock = miditema.InternalClock()
+    clock.enabled = True
+
+    clock.start()
+    assert sys.getswitchinterval() == clock.SWITCH_INTERVAL
+    clock.start()  # Un segundo Start no debe pisar el valor guardado
+    clock.stop()
+    assert sys.getswitchinterval() == original
+    clock.stop()
+    assert sys.getswitchinterval() == original
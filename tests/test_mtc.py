@@ -0,0 +1,34 @@
+"""Tests del motor de MIDI Time Code (MTCEngine) en modo playlist."""
+import miditema
+
+
+def test_locate_in_second_playlist_song_counts_from_its_start(monkeypatch):
+    monkeypatch.setattr(miditema, "clock_state", miditema.ClockState())
+    monkeypatch.setattr(miditema, "song_state", miditema.SongState())
+    monkeypatch.setattr(miditema, "playlist_state", miditema.PlaylistState())
+    miditema.clock_state.status = "PLAYING"
+    miditema.playlist_state.is_active = True
+    miditema.playlist_state.current_song_index = 0
+    seeks, ticks = [], []
+    monkeypatch.setattr(miditema, "seek_song_tick", seeks.append)
+
+    def register_clock_tick(timestamp=None):
+        ticks.append(timestamp)
+        if len(ticks) == 12:  # La primera canción termina en este tick
+            miditema.playlist_state.current_song_index = 1
+
+    monkeypatch.setattr(miditema, "register_clock_tick", register_clock_tick)
+    engine = miditema.MTCEngine()  # Offset 00:00:00:00, 120 BPM -> 48 ticks por segundo
+
+    engine.position = 10.0
+    engine._advance(0.0)
+    assert seeks == [480]
+    engine.position = 10.5
+    engine._advance(0.0)
+    assert len(ticks) == 24
+
+    # Locate del maestro con la segunda canción sonando: empezó en 10.25 s
+    engine._song_tick = None
+    engine.position = 12.25
+    engine._advance(0.0)
+    assert seeks[-1] == 96
@@ -0,0 +1,28 @@
+"""Tests de la caché en disco de canciones parseadas (PersistentSongCache)."""
+import json
+
+import miditema
+
+SONG_TEXT = '{ song_name: "Caché", parts: [{ name: "A", bars: 4 }] }  // JSON5'
+
+
+def test_entries_are_json_and_bad_entries_are_misses(tmp_path):
+    song_path = tmp_path / "song.json5"
+    song_path.write_text(SONG_TEXT, encoding="utf-8")
+    cache = miditema.PersistentSongCache(tmp_path / "cache")
+
+    data, errors = cache.load(song_path)
+    assert errors == [] and data["song_name"] == "Caché"
+    (entry_path,) = (tmp_path / "cache").iterdir()
+    assert json.loads(entry_path.read_text(encoding="utf-8"))["data"] == data
+
+    assert cache.load(song_path) == (data, [])
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Cualquier entrada que no se pueda decodificar se trata como un fallo y se regenera
+    for corrupt in (b"\x80\x04\x95 pickle", b'{"data": [1, 2]}', b'{"trunc'):
+        entry_path.write_bytes(corrupt)
+        assert cache.load(song_path) == (data, [])
+    assert (cache.hits, cache.misses) == (1, 4)
+    assert cache.load(song_path) == (data, [])
+    assert cache.hits == 2
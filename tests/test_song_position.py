@@ -0,0 +1,53 @@
+"""Tests del seguimiento del Song Position Pointer entrante con el transporte parado."""
+import mido
+import miditema
+
+
+SONG = {
+    "song_name": "SPP",
+    "time_signature": "4/4",
+    "triggers": {"part_change": [{"device": "out", "control": 1, "value": "part_index"}]},
+    "parts": [{"name": "A", "bars": 2}, {"name": "B", "bars": 2}, {"name": "C", "bars": 2}],
+}
+
+
+# Globales que reasignan la carga de la canción y el transporte; monkeypatch los restaura
+SONG_GLOBALS = ("song_state", "parked_part_change", "previous_song_index", "beat_flash_end_time",
+                "last_triggered_song_index", "part_loop_active", "part_loop_index",
+                "repeat_override_active", "ui_feedback_message", "feedback_expiry_time")
+
+
+def _load_song(monkeypatch, port):
+    for name in SONG_GLOBALS:
+        monkeypatch.setattr(miditema, name, getattr(miditema, name))
+    monkeypatch.setitem(miditema.midi_outputs, "out", port)
+    monkeypatch.setattr(miditema, "playlist_state", miditema.PlaylistState())
+    monkeypatch.setattr(miditema, "clock_state", miditema.ClockState())
+    monkeypatch.setattr(miditema, "trigger_registry", miditema.TriggerRegistry())
+    monkeypatch.setattr(miditema, "global_parts_manager", miditema.GlobalPartsManager())
+    monkeypatch.setattr(miditema, "initial_outputs_sent", True)
+    assert miditema.load_song_file(data=dict(SONG, parts=[dict(p) for p in SONG["parts"]]))
+    return port
+
+
+def _part_changes(port):
+    return [m.value for m in port.sent if m.type == "control_change" and m.control == 1]
+
+
+def test_spp_while_stopped_only_moves_position(monkeypatch, make_port):
+    port = _load_song(monkeypatch, make_port())
+    # Compás 3 = parte B (16 pasos de semicorchea por compás de 4/4)
+    miditema.process_clock_message(mido.Message("songpos", pos=2 * 16))
+    assert miditema.song_state.current_part_index == 1
+    assert _part_changes(port) == []
+
+    miditema.process_clock_message(mido.Message("continue"))
+    assert _part_changes(port) == [1]
+
+
+def test_spp_zero_then_start_fires_part_once(monkeypatch, make_port):
+    port = _load_song(monkeypatch, make_port())
+    miditema.process_clock_message(mido.Message("songpos", pos=2 * 16))
+    miditema.process_clock_message(mido.Message("songpos", pos=0))
+    miditema.process_clock_message(mido.Message("start"))
+    assert _part_changes(port) == [0]
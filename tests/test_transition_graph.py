@@ -0,0 +1,56 @@
+"""Tests del análisis y la caché de SongTransitionGraph."""
+import miditema
+from schema_validator import MIDItemaValidator
+
+
+def _graph(parts):
+    """Grafo de una canción que pasa la validación del schema."""
+    song = {"song_name": "Grafo", "parts": parts}
+    assert MIDItemaValidator.validate_data(song) == []
+    return miditema.SongTransitionGraph(song["parts"])
+
+
+PARTS = [
+    {"name": "Intro", "bars": 4, "cue": 1, "repeat_pattern": "prev"},
+    {"name": "A", "bars": 4, "repeat_pattern": [{"jump_to_part": 3}, "repeat"]},
+    {"name": "B", "bars": 2, "repeat_pattern": ["repeat", "next", "prev"]},
+    {"name": "C", "bars": 8, "repeat_pattern": [{"random_part": [0, 1]}, True]},
+    {"name": "D", "bars": 4, "repeat_pattern": [{"jump_to_cue": 1}, False]},
+    {"name": "E", "bars": 4, "repeat_pattern": "loop_part"},
+    {"name": "Outro", "bars": 4, "repeat_pattern": [False, {"jump_to_part": 1}]},
+]
+
+
+def test_successors_follow_the_runtime_first_step():
+    graph = _graph([dict(part) for part in PARTS])
+    cues = graph._cue_indices()
+    # "prev" y "next" buscan una parte con compases (o terminan): salen siempre
+    assert graph._zero_bar_successors(0, cues) == {None}
+    assert graph._zero_bar_successors(1, cues) == {3}
+    assert graph._zero_bar_successors(2, cues) == {2}
+    assert graph._zero_bar_successors(3, cues) == {0, 1}
+    assert graph._zero_bar_successors(4, cues) == {0}
+    assert graph._zero_bar_successors(5, cues) == {5}
+    # Un diccionario que no es el primer paso no se ejecuta al llegar con pass_count 0
+    assert graph._zero_bar_successors(6, cues) == {None}
+
+
+def test_table_matches_scan_for_every_state():
+    graph = _graph([dict(part) for part in PARTS])
+    assert graph.warnings == []
+    for start_index in range(-1, len(PARTS) + 1):
+        for direction in ("+1", "-1"):
+            for pass_count in range(3 * graph.period + graph.EXACT_PASS_COUNTS):
+                for repeat_override in (False, True):
+                    assert graph.next_valid(direction, start_index, pass_count, repeat_override) == \
+                        miditema._scan_next_valid_part_index(graph.parts, direction, start_index, pass_count, repeat_override)
+
+
+def test_graph_cache_is_bounded():
+    miditema._transition_graphs.clear()
+    songs = [[{"name": "A", "bars": i + 1}] for i in range(miditema.MAX_TRANSITION_GRAPHS + 5)]
+    for parts in songs:
+        miditema._get_transition_graph(parts)
+    assert len(miditema._transition_graphs) == miditema.MAX_TRANSITION_GRAPHS
+    # La más reciente sigue en caché
+    assert miditema._get_transition_graph(songs[-1]) is miditema._get_transition_graph(songs[-1])
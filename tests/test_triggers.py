@@ -0,0 +1,31 @@
+"""Tests de los triggers compilados (CompiledAction) con valores dinámicos del contexto."""
+import miditema
+
+
+def _fire_setlist_end(monkeypatch, port, action):
+    monkeypatch.setitem(miditema.midi_outputs, "out", port)
+    monkeypatch.setattr(miditema, "playlist_state", miditema.PlaylistState())
+    monkeypatch.setattr(miditema, "trigger_registry", miditema.TriggerRegistry())
+    miditema.playlist_state.is_active = True
+    miditema.playlist_state.playlist_name = "Festival"
+    miditema.playlist_state.playlist_elements = [{"song_name": f"S{i}", "parts": []} for i in range(12)]
+    miditema.playlist_state.triggers = {"setlist_end": [action]}
+    miditema.compile_playlist_triggers()
+    miditema.trigger_registry.rebuild()
+
+    context = {"playlist_name": "Festival", "playlist_song_count": 12, "playlist_part_count": 30}
+    miditema.fire_triggers("setlist_end", context)
+    return port
+
+
+def test_setlist_end_midi_uses_playlist_song_count(monkeypatch, make_port):
+    port = _fire_setlist_end(monkeypatch, make_port(), {"device": "out", "control": 7, "value": "playlist_song_count"})
+    assert [(m.type, m.control, m.value) for m in port.sent] == [("control_change", 7, 12)]
+
+
+def test_setlist_end_osc_resolves_playlist_values(monkeypatch, make_port):
+    client = make_port()
+    monkeypatch.setitem(miditema.osc_outputs, "osc", client)
+    _fire_setlist_end(monkeypatch, make_port(), {"device": "osc", "address": "/setlist/end",
+                                                 "args": ["playlist_name", "playlist_song_count"]})
+    assert [(m.address, m.params) for m in client.sent] == [("/setlist/end", ["Festival", 12])]
@@ -3,6 +3,7 @@
 import html
 import time
 import json
+import json_loader
 from pathlib import Path
 from copy import copy
 
@@ -147,7 +148,7 @@ class ActionStatus(Static):
                 part_idx = miditema.pending_action.get("target_part")
                 if 0 <= song_idx < len(miditema.playlist_state.playlist_elements):
                     song_element = miditema.playlist_state.playlist_elements[song_idx]
-                    # Usamos _get_parts_from_playlist_element para leer del disco si es necesario
+                    # _get_parts_from_playlist_element lee a través de la caché de canciones
                     parts = miditema._get_parts_from_playlist_element(song_element)
                     song_name = song_element.get("song_name", Path(song_element.get("filepath", "N/A")).stem)
                     part_name = parts[part_idx].get("name", "N/A") if part_idx < len(parts) else "N/A"
@@ -213,7 +214,7 @@ class FileContentScreen(Screen):
             raw_content = self.file_path.read_text(encoding='utf-8')
             # Intentamos parsear como JSON para mostrarlo bonito
             try:
-                json_data = self.app.miditema.json5.loads(raw_content)
+                json_data = json_loader.loads(raw_content)
                 self.content = json.dumps(json_data, indent=2)
             except Exception:
                 # Si no es JSON válido, mostramos el texto plano
@@ -594,13 +595,11 @@ class ControlsScreen(Screen):
         if not self.miditema or not self.miditema.playlist_state.is_active:
             return "No hay playlist activa."
         
-        # Importar la función necesaria del módulo miditema
-        import miditema
-        
         cues_found = []
         for s_idx, element in enumerate(self.miditema.playlist_state.playlist_elements):
             song_name = element.get("song_name", f"Canción {s_idx + 1}")
-            parts = miditema._get_parts_from_playlist_element(element)
+            # Usar el módulo de la app (no un 'import miditema' nuevo) para compartir la caché de canciones
+            parts = self.miditema._get_parts_from_playlist_element(element)
             
             for p_idx, part in enumerate(parts):
                 cue = part.get("cue")
@@ -730,6 +729,8 @@ class MiditemaApp(App):
         Binding("pagedown", "song_next", "Canción Siguiente", show=False),
         Binding("home", "song_first", "Primera Canción", show=False),
         Binding("end", "song_last", "Última Canción", show=False),
+        Binding("plus", "tempo_up", "Tempo +1", show=False),
+        Binding("minus", "tempo_down", "Tempo -1", show=False),
     ]
 
     # --- Atributos Reactivos ---
@@ -740,6 +741,7 @@ class MiditemaApp(App):
     clock_status = var("STOPPED")
     clock_source_name = var("")
     bpm = var(0.0)
+    tempo_stable = var(False)
     
     # Estado del Archivo/Setlist
     loaded_filename = var("")
@@ -845,6 +847,12 @@ class MiditemaApp(App):
         else:
             self.miditema.handle_continue()
 
+    def action_tempo_up(self) -> None:
+        self.miditema.nudge_internal_tempo(1)
+
+    def action_tempo_down(self) -> None:
+        self.miditema.nudge_internal_tempo(-1)
+
     def action_toggle_outputs(self) -> None:
         self.miditema.toggle_outputs()
 
@@ -862,6 +870,8 @@ class MiditemaApp(App):
             isinstance(self.miditema.pending_action.get("target"), dict) and 
             self.miditema.pending_action["target"].get("type") == "relative"):
             self.miditema.pending_action["target"]["value"] += value
+            # Modificación in situ: la predicción de la siguiente parte debe recalcularse
+            self.miditema.global_parts_manager.invalidate_prediction()
         else:
             target = {"type": "relative", "value": value}
             self.miditema.pending_action = {"target": target, "quantize": self.miditema.quantize_mode}
@@ -1005,6 +1015,7 @@ class MiditemaApp(App):
         self.clock_status = miditema.clock_state.status
         self.clock_source_name = miditema.clock_state.source_name
         self.bpm = miditema.clock_state.bpm
+        self.tempo_stable = miditema.clock_state.tempo_stable
         self.loaded_filename = miditema.loaded_filename
         
 
@@ -1037,7 +1048,9 @@ class MiditemaApp(App):
         filename_str = f"[{self.loaded_filename}]" if self.loaded_filename else ""
         header_left.update(f"  MIDItema {filename_str}")
         
-        header_right.update(f"{self.bpm:.0f} BPM  ")
+        # '~' delante del BPM mientras el tempo entrante no es estable (arranque, rampas, jitter)
+        tempo_marker = "" if self.tempo_stable or self.bpm == 0 else "~"
+        header_right.update(f"{tempo_marker}{self.bpm:.0f} BPM  ")
 
         status = self.clock_status
         source = self.clock_source_name
@@ -1067,6 +1080,9 @@ class MiditemaApp(App):
     def watch_bpm(self) -> None:
         self._update_header()
 
+    def watch_tempo_stable(self) -> None:
+        self._update_header()
+
     def watch_loaded_filename(self) -> None:
         self._update_header()
         # Cuando se carga un archivo, todo lo demás cambia también.